@@ -12,10 +12,16 @@ pip install Pillow numpy click reportlab svglib
 AI形式の出力にはIllustratorまたは互換ソフトが必要です。
 """
 
+import csv
+import json
 import math
 import os
 import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from multiprocessing import shared_memory
 
 import click
 import numpy as np
@@ -23,6 +29,8 @@ from PIL import Image, ImageEnhance
 
 # PDF/AI生成用ライブラリ
 try:
+    from reportlab.lib import pagesizes
+    from reportlab.lib.utils import ImageReader
     from reportlab.pdfgen import canvas
 
     PDF_AVAILABLE = True
@@ -39,6 +47,104 @@ try:
 except ImportError:
     SVG_AVAILABLE = False
 
+# 網点形状・出力形式・Tシャツのボディ色
+DOT_SHAPES = ["circle", "square", "diamond", "line"]
+OUTPUT_FORMATS = ["PNG", "TIFF", "PDF", "AI"]
+BODY_COLORS = ["white", "black"]
+
+# TIFF圧縮方式（CLI名 → Pillowのcompression名）
+TIFF_COMPRESSIONS = {
+    "none": "raw",
+    "packbits": "packbits",
+    "lzw": "tiff_lzw",
+    "deflate": "tiff_adobe_deflate",
+    "group4": "group4",
+}
+
+# 1bit出力用のエンコーダープリセット
+# benchmark_encoders()の計測結果から選定。網点は周期的な細かいパターンのため
+# CCITT Group 4は非圧縮より大きくなることが多く、既定には使わない。
+ENCODER_PRESETS = {
+    "fast": {"tiff_compression": "packbits", "png_compress_level": 1},
+    "balanced": {"tiff_compression": "lzw", "png_compress_level": 6},
+    "small": {"tiff_compression": "deflate", "png_compress_level": 9},
+}
+
+# 網点エンジン（referenceは1画素ずつ判定する参照実装）
+HALFTONE_ENGINES = ["reference", "stamp", "packed"]
+
+# stampエンジンで一度に転写する網点数（一時配列のメモリ上限）
+STAMP_CHUNK = 65536
+
+# packedエンジンでuint8の作業領域に一度に描画する画素数の目安
+PACKED_BAND_PIXELS = 1 << 20
+
+# compare_engines()で参照実装と比較する高速化構成
+OPTIMIZED_ENGINES = {
+    "stamp": {"engine": "stamp"},
+    "stamp-parallel": {"engine": "stamp", "workers": 2},
+    "reference-parallel": {"engine": "reference", "workers": 2},
+    "packed": {"engine": "packed"},
+    "packed-parallel": {"engine": "packed", "workers": 2},
+}
+
+# ジョブファイルで指定できるパラメーター（convert_imageの引数名 → 型）
+JOB_PARAMS = {
+    "lines": int,
+    "angle": int,
+    "dot_shape": str,
+    "contrast": float,
+    "brightness": int,
+    "dpi": int,
+    "format_type": str,
+    "body_color": str,
+    "encode_preset": str,
+    "tiff_compression": str,
+    "png_compress_level": int,
+    "print_width": float,
+    "print_height": float,
+    "engine": str,
+    "merge_contours": bool,
+}
+
+# CLIオプション名で書かれたパラメーターの読み替え
+JOB_PARAM_ALIASES = {
+    "shape": "dot_shape",
+    "format": "format_type",
+    "png_level": "png_compress_level",
+}
+
+# 処理時間の上限を確認する網点数の間隔（ベクター出力時）
+DEADLINE_CHECK_INTERVAL = 4096
+
+# 処理コストの見積もり係数（計測値を切り上げたもの）
+ENGINE_SECONDS_PER_PIXEL = {"reference": 1e-6, "stamp": 3e-8, "packed": 2e-8}
+ENGINE_BYTES_PER_PIXEL = {"reference": 7, "stamp": 7, "packed": 3.2}
+RASTER_SECONDS_PER_PIXEL = 1.5e-8  # PNG/TIFF保存・ラスター埋め込み
+VECTOR_SECONDS_PER_DOT = {"AI": 1.6e-5, "PDF": 1.4e-4}
+VECTOR_BYTES_PER_DOT = {"AI": 750, "PDF": 400}
+
+# 予算超過時の方針
+BUDGET_POLICIES = ["degrade", "reject"]
+
+# 縮小時に見積もりの誤差を見込んで残す余裕
+BUDGET_SAFETY = 0.8
+
+# 輪郭統合で許容する2値化結果の差（サンプル点に対する不一致の割合）
+MERGE_TOLERANCE = 0.001
+
+
+class BudgetExceededError(click.ClickException):
+    """ジョブが処理コストの上限を超えた"""
+
+    def __init__(self, message, decisions=None):
+        super().__init__(message)
+        self.decisions = decisions or []
+
+
+class JobTimeoutError(BudgetExceededError):
+    """ジョブが処理時間の上限を超えて中断された"""
+
 
 class SilkscreenConverter:
     """シルクスクリーン用データ変換クラス"""
@@ -48,13 +154,38 @@ class SilkscreenConverter:
             ".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff"
         ]
         self.dot_data = []  # ベクターデータ用の網点情報
+        self.deadline = None  # 処理時間の上限（time.monotonic()の値）
+
+    def _check_deadline(self):
+        """処理時間の上限を超えていればジョブを中断"""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JobTimeoutError("処理時間の上限を超えたため中断しました")
+
+    def image_size(self, input_path):
+        """画像をデコードせずにサイズだけを取得"""
+        try:
+            with Image.open(input_path) as image:
+                return image.size
+        except Exception as e:
+            raise click.ClickException(f"画像の読み込みに失敗しました: {e}")
 
-    def load_image(self, input_path):
-        """画像を読み込み、RGBモードに変換"""
+    def load_image(self, input_path, target_size=None, mode="RGB"):
+        """画像を読み込み、指定モード（既定はRGB）に変換
+
+        target_sizeを指定すると、その範囲に収まるよう縮小して読み込む。
+        JPEGはdraftで縮小・グレースケールのままデコードし、
+        使わない解像度のデコードを省く。
+        """
         try:
             image = Image.open(input_path)
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+            if target_size is not None:
+                size = fit_size(image.size, target_size)
+                if size != image.size:
+                    if image.format == "JPEG":
+                        image.draft(mode, size)
+                    image = image.convert(mode).resize(size, Image.LANCZOS)
+            if image.mode != mode:
+                image = image.convert(mode)
             return image
         except Exception as e:
             raise click.ClickException(f"画像の読み込みに失敗しました: {e}")
@@ -76,28 +207,227 @@ class SilkscreenConverter:
         return image
 
     def create_halftone_pattern(
-        self, image, lines, angle, dot_shape="circle", vector_output=False
+        self,
+        image,
+        lines,
+        angle,
+        dot_shape="circle",
+        vector_output=False,
+        workers=1,
+        engine="stamp",
     ):
-        """網点パターンを生成（ベクター出力対応）"""
+        """網点パターンを生成（ベクター出力対応）
+
+        engineは"reference"（1画素ずつ判定する参照実装）、
+        "stamp"（サイズ別の網点マスクを転写する高速版）、
+        "packed"（create_halftone_bitmapでビットパックバッファに描画し、
+        "L"モードに変換して返す）のいずれか。
+        出力はすべて同一で、compare_engines()で検証できる。
+
+        workersに2以上を指定すると、画像を網点間隔に揃えた帯に分割し、
+        共有メモリ上の出力バッファへ複数プロセスで並列に描画する。
+        結果と網点データの順序は直列処理と同一になる。
+        """
         width, height = image.size
         dot_spacing = max(2, int(72 / lines))
         angle_rad = math.radians(angle)
+        if engine not in HALFTONE_ENGINES:
+            raise click.ClickException(f"不明な網点エンジンです: {engine}")
+        if engine == "packed":
+            return self.create_halftone_bitmap(
+                image, lines, angle, dot_shape, vector_output, workers
+            ).convert("L")
 
         # ベクター出力用のデータをクリア
         if vector_output:
             self.dot_data = []
 
-        # ラスター出力用
-        result = Image.new("L", (width, height), 255)
-        result_array = np.array(result)
         img_array = np.array(image)
+        bands = _halftone_bands(height, dot_spacing, workers)
+
+        if len(bands) <= 1:
+            # ラスター出力用
+            result_array = np.full((height, width), 255, dtype=np.uint8)
+            dots = self._halftone_rows(
+                img_array,
+                result_array,
+                0,
+                height,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+                engine,
+            )
+        else:
+            result_array, dots = _parallel_halftone(
+                img_array,
+                bands,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+                workers,
+                engine,
+                self.deadline,
+            )
+
+        if vector_output:
+            self.dot_data = dots
+
+        return Image.fromarray(result_array)
+
+    def create_halftone_bitmap(
+        self,
+        image,
+        lines,
+        angle,
+        dot_shape="circle",
+        vector_output=False,
+        workers=1,
+        invert=False,
+    ):
+        """網点パターンをビットパック形式で生成し、モード"1"の画像を返す
+
+        出力は1画素1ビット（np.packbits形式、1が白）のバッファに直接描画し、
+        uint8の作業領域は数セル行分だけ使う。invertを指定すると
+        ビット反転（黒Tシャツ用）する。結果はstampエンジンと同一。
+        """
+        width, height = image.size
+        dot_spacing = max(2, int(72 / lines))
+        angle_rad = math.radians(angle)
+
+        # ベクター出力用のデータをクリア
+        if vector_output:
+            self.dot_data = []
+
+        bands = _halftone_bands(height, dot_spacing, workers)
+        if len(bands) <= 1:
+            packed = np.full((height, (width + 7) // 8), 255, dtype=np.uint8)
+            dots, _ = self._halftone_packed_rows(
+                image,
+                packed,
+                0,
+                height,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+            )
+        else:
+            packed, dots = _parallel_halftone(
+                np.asarray(image),
+                bands,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+                workers,
+                "packed",
+                self.deadline,
+            )
+
+        if vector_output:
+            self.dot_data = dots
+
+        # 黒Tシャツ用: ビット反転（明るい部分がインクになる）
+        if invert:
+            np.invert(packed, out=packed)
+
+        return Image.frombytes("1", (width, height), packed.tobytes())
+
+    def _halftone_packed_rows(
+        self,
+        image,
+        packed,
+        y_start,
+        y_end,
+        dot_spacing,
+        angle_rad,
+        dot_shape,
+        vector_output=False,
+    ):
+        """y_startからy_endまでのセル行をビットパックバッファに網点化
+
+        数セル行ずつuint8の作業領域へstampエンジンで描画し、
+        packbitsしたビット列をバッファにANDする。y_endより下へ
+        はみ出した行は書き込まず、(開始行, ビット列)として返す。
+        """
+        height = packed.shape[0]
+        if isinstance(image, np.ndarray):
+            width = image.shape[1]
+        else:
+            width = image.size[0]
+        cell_rows = max(1, PACKED_BAND_PIXELS // max(1, width * dot_spacing))
+        band_rows = cell_rows * dot_spacing
+        stamps = {}
+        dots = []
+        spill = None
+
+        for y0 in range(y_start, y_end, band_rows):
+            self._check_deadline()
+            y1 = min(y0 + band_rows, y_end)
+            scratch_end = min(y1 + dot_spacing, height)
+            scratch = np.full((scratch_end - y0, width), 255, dtype=np.uint8)
+            dots.extend(
+                self._halftone_rows_stamp(
+                    _image_rows(image, y0, y1),
+                    scratch,
+                    y0,
+                    y1,
+                    dot_spacing,
+                    angle_rad,
+                    dot_shape,
+                    vector_output,
+                    row_offset=y0,
+                    height=height,
+                    stamps=stamps,
+                )
+            )
+
+            bits = np.packbits(scratch, axis=1)
+            own_rows = min(scratch_end, y_end) - y0
+            packed[y0:y0 + own_rows] &= bits[:own_rows]
+            if scratch_end > y_end:
+                spill = (y_end, bits[own_rows:])
+
+        return dots, spill
 
-        for y in range(0, height, dot_spacing):
+    def _halftone_rows(
+        self,
+        img_array,
+        result_array,
+        y_start,
+        y_end,
+        dot_spacing,
+        angle_rad,
+        dot_shape,
+        vector_output=False,
+        engine="reference",
+    ):
+        """y_startからy_endまでのセル行を網点化し、網点データを返す"""
+        if engine == "stamp":
+            return self._halftone_rows_stamp(
+                img_array,
+                result_array,
+                y_start,
+                y_end,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+            )
+
+        height, width = img_array.shape
+        dots = []
+
+        for y in range(y_start, y_end, dot_spacing):
+            self._check_deadline()
             for x in range(0, width, dot_spacing):
-                y_end = min(y + dot_spacing, height)
-                x_end = min(x + dot_spacing, width)
+                cell_y_end = min(y + dot_spacing, height)
+                cell_x_end = min(x + dot_spacing, width)
 
-                region = img_array[y:y_end, x:x_end]
+                region = img_array[y:cell_y_end, x:cell_x_end]
                 avg_brightness = np.mean(region)
                 darkness = 1.0 - (avg_brightness / 255.0)
                 dot_size = int(dot_spacing * darkness)
@@ -108,7 +438,7 @@ class SilkscreenConverter:
 
                     # ベクター出力用データを保存
                     if vector_output:
-                        self.dot_data.append(
+                        dots.append(
                             {
                                 "x": center_x,
                                 "y": center_y,
@@ -130,7 +460,112 @@ class SilkscreenConverter:
                         height,
                     )
 
-        return Image.fromarray(result_array)
+        return dots
+
+    def _halftone_rows_stamp(
+        self,
+        img_array,
+        result_array,
+        y_start,
+        y_end,
+        dot_spacing,
+        angle_rad,
+        dot_shape,
+        vector_output=False,
+        row_offset=0,
+        height=None,
+        stamps=None,
+    ):
+        """_halftone_rowsの高速版
+
+        セルの平均輝度をまとめて計算し、網点はサイズごとに一度だけ
+        _draw_dotで描いたマスクを同じサイズの全網点へまとめて転写する。
+        計算式は参照実装と同じため出力は一致する。
+
+        img_arrayとresult_arrayは画像のrow_offset行目以降の帯でもよい。
+        その場合heightには画像全体の高さを指定する。
+        """
+        width = img_array.shape[1]
+        if height is None:
+            height = row_offset + img_array.shape[0]
+        if stamps is None:
+            stamps = {}
+        dots = []
+        row_starts = np.arange(y_start, min(y_end, height), dot_spacing)
+        col_starts = np.arange(0, width, dot_spacing)
+        if len(row_starts) == 0 or len(col_starts) == 0:
+            return dots
+
+        # セルごとの平均輝度（np.meanと同じく合計/画素数で計算）
+        band = img_array[
+            y_start - row_offset:
+            min(row_starts[-1] + dot_spacing, height) - row_offset
+        ]
+        row_sums = np.add.reduceat(
+            band, row_starts - y_start, axis=0, dtype=np.int64
+        )
+        sums = np.add.reduceat(row_sums, col_starts, axis=1)
+        row_counts = np.minimum(row_starts + dot_spacing, height) - row_starts
+        col_counts = np.minimum(col_starts + dot_spacing, width) - col_starts
+        avg_brightness = sums / np.outer(row_counts, col_counts)
+        darkness = 1.0 - (avg_brightness / 255.0)
+        dot_sizes = (dot_spacing * darkness).astype(np.int64)
+
+        rows, columns = np.nonzero(dot_sizes > 0)
+        sizes = dot_sizes[rows, columns]
+        centers_x = col_starts[columns] + dot_spacing // 2
+        centers_y = row_starts[rows] + dot_spacing // 2
+
+        # ベクター出力用データを保存（参照実装と同じ行優先の順序）
+        if vector_output:
+            dots = [
+                {
+                    "x": x,
+                    "y": y,
+                    "size": size,
+                    "shape": dot_shape,
+                    "angle": angle_rad,
+                }
+                for x, y, size in zip(
+                    centers_x.tolist(), centers_y.tolist(), sizes.tolist()
+                )
+            ]
+
+        row_limit = min(height, row_offset + result_array.shape[0])
+        for dot_size in np.unique(sizes).tolist():
+            self._check_deadline()
+            if dot_size not in stamps:
+                stamps[dot_size] = self._dot_offsets(
+                    dot_size, angle_rad, dot_shape
+                )
+            offset_y, offset_x = stamps[dot_size]
+
+            # 同じサイズの網点をまとめて転写（範囲外の画素は除外）
+            selected = np.nonzero(sizes == dot_size)[0]
+            for start in range(0, len(selected), STAMP_CHUNK):
+                chunk = selected[start:start + STAMP_CHUNK]
+                ys = (centers_y[chunk, None] + offset_y).ravel()
+                xs = (centers_x[chunk, None] + offset_x).ravel()
+                inside = (
+                    (ys >= row_offset)
+                    & (ys < row_limit)
+                    & (xs >= 0)
+                    & (xs < width)
+                )
+                result_array[ys[inside] - row_offset, xs[inside]] = 0
+
+        return dots
+
+    def _dot_offsets(self, dot_size, angle_rad, dot_shape):
+        """網点の中心からの(行, 列)オフセットを参照実装で求める"""
+        radius = dot_size // 2
+        side = 2 * radius + 1
+        scratch = np.full((side, side), 255, dtype=np.uint8)
+        self._draw_dot(
+            scratch, radius, radius, dot_size, angle_rad, dot_shape, side, side
+        )
+        offset_y, offset_x = np.nonzero(scratch == 0)
+        return offset_y - radius, offset_x - radius
 
     def _draw_dot(
         self, array, center_x, center_y, size, angle, shape, width, height
@@ -179,11 +614,56 @@ class SilkscreenConverter:
 
         return image.point(binarize, mode="1")
 
-    def save_image(self, image, output_path, format_type="PNG", dpi=300):
+    def encoder_options(
+        self,
+        image,
+        format_type="PNG",
+        preset="balanced",
+        tiff_compression=None,
+        png_compress_level=None,
+    ):
+        """形式別のエンコーダー設定を作成"""
+        if preset not in ENCODER_PRESETS:
+            raise click.ClickException(f"不明なエンコーダープリセットです: {preset}")
+        settings = ENCODER_PRESETS[preset]
+        format_type = format_type.upper()
+
+        if format_type == "TIFF":
+            compression = tiff_compression or settings["tiff_compression"]
+            if compression not in TIFF_COMPRESSIONS:
+                raise click.ClickException(f"不明なTIFF圧縮方式です: {compression}")
+            if compression == "group4" and image.mode != "1":
+                # CCITT Group 4は2階調画像専用
+                compression = "packbits"
+            return {"compression": TIFF_COMPRESSIONS[compression]}
+
+        if format_type == "PNG":
+            level = png_compress_level
+            if level is None:
+                level = settings["png_compress_level"]
+            return {"compress_level": level}
+
+        return {}
+
+    def save_image(
+        self,
+        image,
+        output_path,
+        format_type="PNG",
+        dpi=300,
+        preset="balanced",
+        tiff_compression=None,
+        png_compress_level=None,
+    ):
         """画像を指定形式で保存"""
+        options = self.encoder_options(
+            image, format_type, preset, tiff_compression, png_compress_level
+        )
         try:
             if format_type.upper() in ["PNG", "TIFF", "JPG", "JPEG"]:
-                image.save(output_path, format=format_type, dpi=(dpi, dpi))
+                image.save(
+                    output_path, format=format_type, dpi=(dpi, dpi), **options
+                )
             else:
                 image.save(output_path)
 
@@ -193,7 +673,7 @@ class SilkscreenConverter:
         except Exception as e:
             raise click.ClickException(f"画像の保存に失敗しました: {e}")
 
-    def save_pdf(self, image, output_path, dpi=300):
+    def save_pdf(self, image, output_path, dpi=300, merge_contours=False):
         """PDF形式で保存（ベクターデータ対応）"""
         if not PDF_AVAILABLE:
             raise click.ClickException(
@@ -201,6 +681,7 @@ class SilkscreenConverter:
             )
 
         try:
+            start = time.perf_counter()
             width, height = image.size
 
             # PDF用のサイズ計算（ポイント単位）
@@ -209,66 +690,115 @@ class SilkscreenConverter:
 
             # PDFキャンバス作成
             c = canvas.Canvas(output_path, pagesize=(pdf_width, pdf_height))
-
-            if self.dot_data:
-                # ベクターデータがある場合は網点を描画
-                c.setFillColor("black")
-                c.setStrokeColor("black")
-
-                scale_x = pdf_width / width
-                scale_y = pdf_height / height
-
-                for dot in self.dot_data:
-                    x = dot["x"] * scale_x
-                    y = pdf_height - (dot["y"] * scale_y)  # PDFは下原点
-                    size = dot["size"] * min(scale_x, scale_y)
-
-                    if dot["shape"] == "circle":
-                        c.circle(x, y, size / 2, fill=1)
-                    elif dot["shape"] == "square":
-                        c.rect(x - size / 2, y - size / 2, size, size, fill=1)
-                    elif dot["shape"] == "diamond":
-                        # ダイヤモンド形状
-                        points = [
-                            (x, y + size / 2),  # 上
-                            (x + size / 2, y),  # 右
-                            (x, y - size / 2),  # 下
-                            (x - size / 2, y),  # 左
-                        ]
-                        path = c.beginPath()
-                        path.moveTo(*points[0])
-                        for point in points[1:]:
-                            path.lineTo(*point)
-                        path.close()
-                        c.drawPath(path, fill=1)
-                    elif dot["shape"] == "line":
-                        # ライン形状
-                        c.rect(
-                            x - size / 2, y - size * 0.15,
-                            size, size * 0.3, fill=1
-                        )
-            else:
-                # ラスター画像をPDFに埋め込み
-                with tempfile.NamedTemporaryFile(
-                    suffix=".png", delete=False
-                ) as temp_file:
-                    temp_path = temp_file.name
-                    image.save(temp_path, "PNG", dpi=(dpi, dpi))
-                    c.drawImage(temp_path, 0, 0, pdf_width, pdf_height)
-                os.unlink(temp_path)
-
+            elements = self._draw_pdf_page(
+                c, image, self.dot_data, dpi, merge_contours
+            )
             c.save()
             click.echo(f"✅ PDF保存完了: {output_path}")
+            if merge_contours and self.dot_data:
+                self._report_merge(
+                    len(self.dot_data), elements, time.perf_counter() - start
+                )
 
+        except BudgetExceededError:
+            raise
         except Exception as e:
             raise click.ClickException(f"PDF保存に失敗しました: {e}")
 
-    def save_ai(self, image, output_path, dpi=300):
+    def _report_merge(self, dot_count, element_count, seconds):
+        """輪郭統合による要素数の削減と書き出し時間を表示"""
+        click.echo(
+            f"🔗 輪郭統合: 網点 {dot_count}個 → {element_count}要素 "
+            f"({1 - element_count / dot_count:.1%}削減), "
+            f"書き出し {seconds:.2f}秒"
+        )
+
+    def _draw_pdf_page(self, c, image, dot_data, dpi=300, merge_contours=False):
+        """網点（またはラスター画像）を現在の原点からPDFキャンバスに描画
+
+        描画した要素数（網点と複合パスの数）を返す。
+        """
+        width, height = image.size
+        pdf_width = (width * 72) / dpi
+        pdf_height = (height * 72) / dpi
+
+        if dot_data:
+            # ベクターデータがある場合は網点を描画
+            c.setFillColor("black")
+            c.setStrokeColor("black")
+
+            scale_x = pdf_width / width
+            scale_y = pdf_height / height
+
+            paths = []
+            if merge_contours:
+                self._check_deadline()
+                dot_data, paths = merge_touching_dots(dot_data)
+
+            for path_data in paths:
+                self._check_deadline()
+                path = c.beginPath()
+                for loop in path_data["loops"]:
+                    points = [
+                        (x * scale_x, pdf_height - y * scale_y) for x, y in loop
+                    ]
+                    path.moveTo(*points[0])
+                    for point in points[1:]:
+                        path.lineTo(*point)
+                    path.close()
+                for x, y, radius in path_data["circles"]:
+                    path.circle(
+                        x * scale_x,
+                        pdf_height - y * scale_y,
+                        radius * min(scale_x, scale_y),
+                    )
+                # 穴の向きの扱いをAI（SVG）出力と揃える
+                c.drawPath(path, fill=1, fillMode=canvas.FILL_NON_ZERO)
+
+            for index, dot in enumerate(dot_data):
+                if index % DEADLINE_CHECK_INTERVAL == 0:
+                    self._check_deadline()
+                x = dot["x"] * scale_x
+                y = pdf_height - (dot["y"] * scale_y)  # PDFは下原点
+                size = dot["size"] * min(scale_x, scale_y)
+
+                if dot["shape"] == "circle":
+                    c.circle(x, y, size / 2, fill=1)
+                elif dot["shape"] == "square":
+                    c.rect(x - size / 2, y - size / 2, size, size, fill=1)
+                elif dot["shape"] == "diamond":
+                    # ダイヤモンド形状
+                    points = [
+                        (x, y + size / 2),  # 上
+                        (x + size / 2, y),  # 右
+                        (x, y - size / 2),  # 下
+                        (x - size / 2, y),  # 左
+                    ]
+                    path = c.beginPath()
+                    path.moveTo(*points[0])
+                    for point in points[1:]:
+                        path.lineTo(*point)
+                    path.close()
+                    c.drawPath(path, fill=1)
+                elif dot["shape"] == "line":
+                    # ライン形状
+                    c.rect(
+                        x - size / 2, y - size * 0.15,
+                        size, size * 0.3, fill=1
+                    )
+            return len(dot_data) + len(paths)
+        else:
+            # ラスター画像をPDFに埋め込み（一時ファイルを経由しない）
+            c.drawImage(ImageReader(image), 0, 0, pdf_width, pdf_height)
+            return 1
+
+    def save_ai(self, image, output_path, dpi=300, merge_contours=False):
         """AI形式で保存（SVGベース）"""
         if not SVG_AVAILABLE:
             raise click.ClickException("AI出力にはxml.etree.ElementTreeが必要です")
 
         try:
+            start = time.perf_counter()
             width, height = image.size
 
             # SVG作成（AI互換形式）
@@ -293,7 +823,18 @@ class SilkscreenConverter:
                 group.set("fill", "#000000")  # K-100%
                 group.set("stroke", "none")
 
-                for dot in self.dot_data:
+                dot_data, paths = self.dot_data, []
+                if merge_contours:
+                    self._check_deadline()
+                    dot_data, paths = merge_touching_dots(dot_data)
+                for path_data in paths:
+                    self._check_deadline()
+                    path = ET.SubElement(group, "path")
+                    path.set("d", _svg_path_data(path_data))
+
+                for index, dot in enumerate(dot_data):
+                    if index % DEADLINE_CHECK_INTERVAL == 0:
+                        self._check_deadline()
                     x, y, size = dot["x"], dot["y"], dot["size"]
                     shape = dot["shape"]
 
@@ -358,73 +899,1656 @@ class SilkscreenConverter:
 
             click.echo(f"✅ AI形式保存完了: {output_path}")
             click.echo("   ※ Adobe IllustratorまたはInkscapeで開けます")
+            if merge_contours and self.dot_data:
+                self._report_merge(
+                    len(self.dot_data),
+                    len(dot_data) + len(paths),
+                    time.perf_counter() - start,
+                )
 
+        except BudgetExceededError:
+            raise
         except Exception as e:
             raise click.ClickException(f"AI保存に失敗しました: {e}")
 
-    def convert(
+    def halftone_bitmap(
         self,
-        input_path,
-        output_path,
+        gray_image,
         lines=15,
         angle=45,
         dot_shape="circle",
-        contrast=1.0,
-        brightness=0,
-        dpi=300,
-        format_type="PNG",
         body_color="white",
+        vector_output=False,
+        engine="packed",
+        workers=1,
     ):
-        """メイン変換処理"""
+        """グレースケール画像から網点化済みのモノクロ2階調画像を作成"""
+        if engine == "packed":
+            return self.create_halftone_bitmap(
+                gray_image,
+                lines,
+                angle,
+                dot_shape,
+                vector_output,
+                workers,
+                invert=body_color.lower() == "black",
+            )
 
-        click.echo(f"🔄 変換開始: {input_path}")
-        click.echo(f"   設定 - 線数: {lines}, 角度: {angle}°, 形状: {dot_shape}, Tシャツ: {body_color}")
+        halftone_image = self.create_halftone_pattern(
+            gray_image, lines, angle, dot_shape, vector_output, workers, engine
+        )
 
-        # ベクター出力が必要かどうかを判定
-        vector_output = format_type.upper() in ["AI", "PDF"]
+        # Tシャツボディ色に応じた処理
+        if body_color.lower() == "black":
+            # 黒Tシャツ用: 画像を反転（明るい部分がインクになる）
+            halftone_image = halftone_image.point(lambda x: 255 - x)
+
+        return self.to_monochrome_bitmap(halftone_image)
 
-        # 1. 画像読み込み
-        image = self.load_image(input_path)
+    def load_grayscale(self, input_path, target_size=None):
+        """画像を読み込み、グレースケールに変換"""
+
+        # 1. 画像読み込み（印刷サイズ指定時は必要な解像度まで縮小）
+        if target_size is None:
+            image = self.load_image(input_path)
+        else:
+            image = self.load_image(input_path, target_size, mode="L")
         click.echo(f"📷 画像読み込み完了: {image.size[0]}x{image.size[1]}")
 
         # 2. グレースケール変換
         gray_image = self.to_grayscale(image)
         click.echo("🔄 グレースケール変換完了")
+        self._check_deadline()
+
+        return gray_image
+
+    def render_image(
+        self,
+        gray_image,
+        lines=15,
+        angle=45,
+        dot_shape="circle",
+        contrast=1.0,
+        brightness=0,
+        body_color="white",
+        vector_output=False,
+        workers=1,
+        engine="packed",
+    ):
+        """グレースケール画像を保存直前のモノクロ2階調画像まで処理"""
 
         # 3. 明度・コントラスト調整
         if contrast != 1.0 or brightness != 0:
             gray_image = self.adjust_image(gray_image, contrast, brightness)
             click.echo("🔄 明度・コントラスト調整完了")
 
-        # 4. 網点処理（ベクター対応）
-        halftone_image = self.create_halftone_pattern(
-            gray_image, lines, angle, dot_shape, vector_output
+        # 4-6. 網点処理・ボディ色に応じた反転・モノクロ2階調変換
+        final_image = self.halftone_bitmap(
+            gray_image,
+            lines,
+            angle,
+            dot_shape,
+            body_color,
+            vector_output,
+            engine,
+            workers,
         )
         click.echo("🔄 網点処理完了")
-
-        # 5. Tシャツボディ色に応じた処理
         if body_color.lower() == "black":
-            # 黒Tシャツ用: 画像を反転（明るい部分がインクになる）
-            halftone_image = halftone_image.point(lambda x: 255 - x)
             click.echo("🔄 黒Tシャツ用画像反転完了")
-        
-        # 6. モノクロ2階調変換
-        final_image = self.to_monochrome_bitmap(halftone_image)
         click.echo("🔄 モノクロ2階調変換完了")
 
+        return final_image
+
+    def render(
+        self,
+        input_path,
+        lines=15,
+        angle=45,
+        dot_shape="circle",
+        contrast=1.0,
+        brightness=0,
+        body_color="white",
+        vector_output=False,
+        target_size=None,
+        workers=1,
+        engine="packed",
+    ):
+        """画像を読み込み、保存直前のモノクロ2階調画像まで処理"""
+        gray_image = self.load_grayscale(input_path, target_size)
+        return self.render_image(
+            gray_image,
+            lines,
+            angle,
+            dot_shape,
+            contrast,
+            brightness,
+            body_color,
+            vector_output,
+            workers,
+            engine,
+        )
+
+    def convert_image(
+        self,
+        gray_image,
+        output_path,
+        lines=15,
+        angle=45,
+        dot_shape="circle",
+        contrast=1.0,
+        brightness=0,
+        dpi=300,
+        format_type="PNG",
+        body_color="white",
+        encode_preset="balanced",
+        tiff_compression=None,
+        png_compress_level=None,
+        workers=1,
+        engine="packed",
+        vector_output=None,
+        merge_contours=False,
+    ):
+        """読み込み済みのグレースケール画像を変換して保存
+
+        vector_outputにFalseを指定すると、AI/PDFでも網点を
+        ラスター画像として埋め込む。
+        """
+
+        # ベクター出力が必要かどうかを判定
+        if vector_output is None:
+            vector_output = format_type.upper() in ["AI", "PDF"]
+
+        # 3-6. 調整からモノクロ2階調変換まで
+        final_image = self.render_image(
+            gray_image,
+            lines,
+            angle,
+            dot_shape,
+            contrast,
+            brightness,
+            body_color,
+            vector_output,
+            workers,
+            engine,
+        )
+
         # 7. 形式別保存
+        if not vector_output:
+            self.dot_data = []
+        self._check_deadline()
         if format_type.upper() == "PDF":
-            self.save_pdf(final_image, output_path, dpi)
+            self.save_pdf(final_image, output_path, dpi, merge_contours)
         elif format_type.upper() == "AI":
-            self.save_ai(final_image, output_path, dpi)
+            self.save_ai(final_image, output_path, dpi, merge_contours)
         else:
-            self.save_image(final_image, output_path, format_type, dpi)
+            self.save_image(
+                final_image,
+                output_path,
+                format_type,
+                dpi,
+                encode_preset,
+                tiff_compression,
+                png_compress_level,
+            )
 
         return final_image
 
+    def convert(
+        self,
+        input_path,
+        output_path,
+        lines=15,
+        angle=45,
+        dot_shape="circle",
+        contrast=1.0,
+        brightness=0,
+        dpi=300,
+        format_type="PNG",
+        body_color="white",
+        encode_preset="balanced",
+        tiff_compression=None,
+        png_compress_level=None,
+        print_width=None,
+        print_height=None,
+        workers=1,
+        engine="packed",
+        budget=None,
+        merge_contours=False,
+    ):
+        """メイン変換処理
+
+        budget（JobBudget）を指定すると、処理前にコストを見積もり、
+        上限に応じて拒否・縮小・エンジン切り替えを行い、
+        処理時間の上限を超えた時点で中断する。
+        """
+
+        click.echo(f"🔄 変換開始: {input_path}")
+        click.echo(f"   設定 - 線数: {lines}, 角度: {angle}°, 形状: {dot_shape}, Tシャツ: {body_color}")
+
+        target_size = print_size_to_pixels(print_width, print_height, dpi)
+        vector_output = None
+        if budget is not None:
+            size = self.image_size(input_path)
+            if target_size is not None:
+                size = fit_size(size, target_size)
+            plan = budget.plan(size, lines, format_type, engine)
+            if plan["size"] != size:
+                target_size = plan["size"]
+            engine = plan["engine"]
+            vector_output = plan["vector_output"]
+
+        try:
+            if budget is not None:
+                self.deadline = budget.deadline()
+
+            # 1-2. 読み込み・グレースケール変換
+            gray_image = self.load_grayscale(input_path, target_size)
+
+            # 3-7. 調整・網点処理・保存
+            return self.convert_image(
+                gray_image,
+                output_path,
+                lines,
+                angle,
+                dot_shape,
+                contrast,
+                brightness,
+                dpi,
+                format_type,
+                body_color,
+                encode_preset,
+                tiff_compression,
+                png_compress_level,
+                workers,
+                engine,
+                vector_output,
+                merge_contours,
+            )
+        finally:
+            self.deadline = None
+
+    def convert_batch_pdf(
+        self,
+        input_files,
+        output_path,
+        lines=15,
+        angle=45,
+        dot_shape="circle",
+        contrast=1.0,
+        brightness=0,
+        dpi=300,
+        body_color="white",
+        sheet_size=None,
+        grid=(1, 1),
+        workers=None,
+        print_width=None,
+        print_height=None,
+        merge_contours=False,
+        budget=None,
+    ):
+        """複数画像を1つのマルチページPDF（または面付けシート）に変換
+
+        変換は並列で行い、ページは入力順に単一のライタが書き出す。
+        先読みはワーカー数までに制限するため、メモリ上に保持される
+        網点データはおおむね書き出し中の1ページ分となる。
+        budget（JobBudget）はページごとの網点化に適用する。
+        """
+        if not PDF_AVAILABLE:
+            raise click.ClickException(
+                "PDF出力にはreportlabが必要です: pip install reportlab"
+            )
+
+        tasks = [
+            (
+                input_file,
+                lines,
+                angle,
+                dot_shape,
+                contrast,
+                brightness,
+                body_color,
+                print_size_to_pixels(print_width, print_height, dpi),
+                budget,
+            )
+            for input_file in input_files
+        ]
+
+        writer = BatchPdfWriter(
+            output_path, dpi, sheet_size, grid, merge_contours=merge_contours
+        )
+        written = 0
+        try:
+            pages = _iter_rendered_pages(tasks, workers)
+            for input_file, (page, error) in zip(input_files, pages):
+                if error is not None:
+                    click.echo(f"❌ エラー ({input_file}): {error}")
+                    continue
+                image, dot_data = page
+                writer.add_page(image, dot_data)
+                written += 1
+                # 書き出し済みページの網点データはすぐに解放する
+                del image, dot_data, page
+        finally:
+            writer.close()
+
+        click.echo(
+            f"✅ マルチページPDF保存完了: {output_path} "
+            f"({written}デザイン, {writer.page_count}ページ)"
+        )
+        return written
+
+
+class BatchPdfWriter:
+    """変換結果を1つのPDFへ順番に書き出すライタ
+
+    sheet_sizeを省略するとデザインごとに原寸の1ページを作成する。
+    指定した場合はgrid（列数, 行数）に従ってシートへ面付けする。
+    """
+
+    def __init__(
+        self,
+        output_path,
+        dpi=300,
+        sheet_size=None,
+        grid=(1, 1),
+        margin=18,
+        merge_contours=False,
+    ):
+        self.output_path = output_path
+        self.dpi = dpi
+        self.merge_contours = merge_contours
+        self.sheet_size = sheet_size
+        self.columns, self.rows = grid
+        self.margin = margin
+        self.page_count = 0
+        self._slot = 0
+        self._converter = SilkscreenConverter()
+
+        if sheet_size is not None and min(sheet_size) <= 2 * margin:
+            raise click.ClickException("シートサイズが小さすぎて面付けできません")
+
+        pagesize = sheet_size or pagesizes.A4
+        self._canvas = canvas.Canvas(
+            output_path, pagesize=pagesize, pageCompression=1
+        )
+
+    def add_page(self, image, dot_data):
+        """1デザイン分を書き出す"""
+        width, height = image.size
+        pdf_width = (width * 72) / self.dpi
+        pdf_height = (height * 72) / self.dpi
+        c = self._canvas
+
+        if self.sheet_size is None:
+            c.setPageSize((pdf_width, pdf_height))
+            self._converter._draw_pdf_page(
+                c, image, dot_data, self.dpi, self.merge_contours
+            )
+            c.showPage()
+            self.page_count += 1
+            return
+
+        # 面付け: 左上から右方向へ配置し、原寸を超えない範囲で縮小
+        sheet_width, sheet_height = self.sheet_size
+        cell_width = (sheet_width - 2 * self.margin) / self.columns
+        cell_height = (sheet_height - 2 * self.margin) / self.rows
+        scale = min(1.0, cell_width / pdf_width, cell_height / pdf_height)
+        if scale < 1.0:
+            click.echo(f"⚠️  セルに収まらないため{scale:.0%}に縮小して面付けします")
+
+        column = self._slot % self.columns
+        row = self._slot // self.columns
+        cell_x = self.margin + column * cell_width
+        cell_y = sheet_height - self.margin - (row + 1) * cell_height
+
+        c.saveState()
+        c.translate(
+            cell_x + (cell_width - pdf_width * scale) / 2,
+            cell_y + (cell_height - pdf_height * scale) / 2,
+        )
+        c.scale(scale, scale)
+        self._converter._draw_pdf_page(
+            c, image, dot_data, self.dpi, self.merge_contours
+        )
+        c.restoreState()
+
+        self._slot += 1
+        if self._slot == self.columns * self.rows:
+            c.showPage()
+            self.page_count += 1
+            self._slot = 0
+
+    def close(self):
+        """未確定のシートを確定してPDFを保存"""
+        if self._slot:
+            self._canvas.showPage()
+            self.page_count += 1
+            self._slot = 0
+        self._canvas.save()
+
+
+class JobBudget:
+    """1ジョブあたりの画素数・メモリ・処理時間の上限
+
+    policyが"degrade"の場合は上限に収まるよう処理を軽くし、
+    "reject"の場合は上限を超えるジョブを拒否する。
+    """
+
+    def __init__(
+        self,
+        max_pixels=None,
+        max_memory_mb=None,
+        timeout=None,
+        policy="degrade",
+    ):
+        if policy not in BUDGET_POLICIES:
+            raise click.ClickException(f"不明な予算超過時の方針です: {policy}")
+        self.max_pixels = max_pixels
+        self.max_memory = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        self.timeout = timeout
+        self.policy = policy
+
+    def deadline(self):
+        """今から処理を始めた場合の処理時間の上限"""
+        if self.timeout is None:
+            return None
+        return time.monotonic() + self.timeout
+
+    def _over(self, cost):
+        """見積もりが上限を超えている項目の説明（収まっていれば空）"""
+        reasons = []
+        if self.max_memory is not None and cost["memory_bytes"] > self.max_memory:
+            reasons.append(
+                f"メモリ {cost['memory_bytes'] / 2**20:.0f}MiB"
+                f" > {self.max_memory / 2**20:.0f}MiB"
+            )
+        if self.timeout is not None and cost["seconds"] > self.timeout:
+            reasons.append(
+                f"処理時間 {cost['seconds']:.1f}秒 > {self.timeout:.1f}秒"
+            )
+        return reasons
+
+    def _decide(self, decisions, message):
+        """判断を記録して表示"""
+        decisions.append(message)
+        click.echo(f"⚖️  {message}")
+
+    def _reject(self, decisions, reason):
+        """ジョブを拒否"""
+        self._decide(decisions, f"拒否: {reason}")
+        raise BudgetExceededError(
+            f"ジョブが処理コストの上限を超えています: {reason}", decisions
+        )
+
+    def plan(self, size, lines, format_type="PNG", engine="packed"):
+        """見積もりに基づき、画像サイズ・エンジン・ベクター出力の有無を決定
+
+        上限を超える場合は、画素数の上限までの縮小、packedエンジンへの
+        切り替え、AI/PDFのラスター埋め込み、さらなる縮小の順に処理を
+        軽くする。判断はすべて表示し、decisionsとして返す。
+        """
+        decisions = []
+        width, height = size
+        vector_output = format_type.upper() in ["AI", "PDF"]
+
+        # 1. 画素数の上限
+        if self.max_pixels is not None and width * height > self.max_pixels:
+            reason = f"画素数 {width * height} > {self.max_pixels}"
+            if self.policy == "reject":
+                self._reject(decisions, reason)
+            scale = math.sqrt(self.max_pixels / (width * height))
+            width = max(1, int(width * scale))
+            height = max(1, int(height * scale))
+            self._decide(decisions, f"縮小: {reason} → {width}x{height}")
+
+        cost = estimate_cost(
+            (width, height), lines, format_type, engine, vector_output
+        )
+        reasons = self._over(cost)
+        if reasons and self.policy == "reject":
+            self._reject(decisions, ", ".join(reasons))
+
+        # 2. 高速なエンジンへの切り替え
+        if reasons and engine != "packed":
+            engine = "packed"
+            cost = estimate_cost(
+                (width, height), lines, format_type, engine, vector_output
+            )
+            self._decide(
+                decisions, f"エンジン切り替え: {', '.join(reasons)} → packed"
+            )
+            reasons = self._over(cost)
+
+        # 3. AI/PDFは網点をラスター画像として埋め込む
+        if reasons and vector_output:
+            vector_output = False
+            cost = estimate_cost(
+                (width, height), lines, format_type, engine, vector_output
+            )
+            self._decide(
+                decisions, f"ラスター埋め込み: {', '.join(reasons)}"
+            )
+            reasons = self._over(cost)
+
+        # 4. 見積もりが上限に収まるまで縮小
+        if reasons:
+            ratios = []
+            if self.max_memory is not None:
+                ratios.append(self.max_memory / cost["memory_bytes"])
+            if self.timeout is not None:
+                ratios.append(self.timeout / cost["seconds"])
+            scale = math.sqrt(min(ratios) * BUDGET_SAFETY)
+            width = max(1, int(width * scale))
+            height = max(1, int(height * scale))
+            cost = estimate_cost(
+                (width, height), lines, format_type, engine, vector_output
+            )
+            self._decide(
+                decisions, f"縮小: {', '.join(reasons)} → {width}x{height}"
+            )
+
+        if not decisions:
+            click.echo(
+                f"⚖️  予算内: 推定 {cost['memory_bytes'] / 2**20:.0f}MiB, "
+                f"{cost['seconds']:.1f}秒"
+            )
+
+        return {
+            "size": (width, height),
+            "engine": engine,
+            "vector_output": vector_output,
+            "cost": cost,
+            "decisions": decisions,
+        }
+
+
+def _render_batch_page(task):
+    """ワーカープロセス用: 1ファイルを変換し(画像, 網点データ)を返す
+
+    budget（JobBudget）があれば見積もりに従って処理を軽くし、
+    拒否・時間切れのページは変換に失敗したファイルと同様に扱う。
+    """
+    (
+        input_path,
+        lines,
+        angle,
+        dot_shape,
+        contrast,
+        brightness,
+        body_color,
+        target_size,
+        budget,
+    ) = task
+    converter = SilkscreenConverter()
+    try:
+        vector_output = True
+        engine = "packed"
+        if budget is not None:
+            size = converter.image_size(input_path)
+            if target_size is not None:
+                size = fit_size(size, target_size)
+            plan = budget.plan(size, lines, "PDF", engine)
+            if plan["size"] != size:
+                target_size = plan["size"]
+            vector_output = plan["vector_output"]
+            engine = plan["engine"]
+            converter.deadline = budget.deadline()
+
+        image = converter.render(
+            input_path,
+            lines,
+            angle,
+            dot_shape,
+            contrast,
+            brightness,
+            body_color,
+            vector_output=vector_output,
+            target_size=target_size,
+            engine=engine,
+        )
+        return (image, converter.dot_data), None
+    except Exception as e:
+        return None, str(e)
+    finally:
+        converter.deadline = None
+
+
+def _iter_rendered_pages(tasks, workers=None):
+    """変換結果を入力順に返す（先読みはワーカー数まで）"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _render_batch_page(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_render_batch_page, task))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _halftone_bands(height, dot_spacing, workers=1):
+    """網点間隔に揃えた帯（開始行, 終了行）のリストを返す"""
+    cell_rows = list(range(0, height, dot_spacing))
+    workers = max(1, min(workers or 1, len(cell_rows)))
+    if workers == 1:
+        return [(0, height)]
+
+    bands = []
+    per_band, extra = divmod(len(cell_rows), workers)
+    index = 0
+    for band in range(workers):
+        count = per_band + (1 if band < extra else 0)
+        y_start = cell_rows[index]
+        index += count
+        y_end = cell_rows[index] if index < len(cell_rows) else height
+        bands.append((y_start, y_end))
+    return bands
+
+
+def _halftone_band(task):
+    """ワーカープロセス用: 共有メモリ上の1帯分を網点化"""
+    (
+        image_name,
+        result_name,
+        shape,
+        result_shape,
+        y_start,
+        y_end,
+        dot_spacing,
+        angle_rad,
+        dot_shape,
+        vector_output,
+        engine,
+        deadline,
+    ) = task
+    image_shm = shared_memory.SharedMemory(name=image_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    try:
+        img_array = np.ndarray(shape, dtype=np.uint8, buffer=image_shm.buf)
+        result_array = np.ndarray(
+            result_shape, dtype=np.uint8, buffer=result_shm.buf
+        )
+        converter = SilkscreenConverter()
+        converter.deadline = deadline
+        if engine == "packed":
+            # ビット単位の書き込みは読み書きを伴うため、帯の外へ
+            # はみ出した行は親プロセスでまとめて合成する
+            dots, spill = converter._halftone_packed_rows(
+                img_array,
+                result_array,
+                y_start,
+                y_end,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+            )
+        else:
+            # 帯の境界をまたぐ網点は隣の帯にも書き込むが、
+            # 書き込むのは常に0（黒）なので書き込み順によらず結果は同じ
+            dots = converter._halftone_rows(
+                img_array,
+                result_array,
+                y_start,
+                y_end,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+                engine,
+            )
+            spill = None
+        del img_array, result_array
+        return dots, spill
+    finally:
+        image_shm.close()
+        result_shm.close()
+
+
+def _parallel_halftone(
+    img_array,
+    bands,
+    dot_spacing,
+    angle_rad,
+    dot_shape,
+    vector_output,
+    workers,
+    engine="stamp",
+    deadline=None,
+):
+    """帯ごとに並列で網点化し、(出力配列, 網点データ)を返す
+
+    engineが"packed"の場合、出力配列はビットパック形式になる。
+    """
+    shape = img_array.shape
+    if engine == "packed":
+        result_shape = (shape[0], (shape[1] + 7) // 8)
+    else:
+        result_shape = shape
+    image_shm = shared_memory.SharedMemory(
+        create=True, size=max(1, img_array.size)
+    )
+    result_shm = shared_memory.SharedMemory(
+        create=True, size=max(1, result_shape[0] * result_shape[1])
+    )
+    try:
+        shared_image = np.ndarray(shape, dtype=np.uint8, buffer=image_shm.buf)
+        shared_image[:] = img_array
+        shared_result = np.ndarray(
+            result_shape, dtype=np.uint8, buffer=result_shm.buf
+        )
+        shared_result.fill(255)
+
+        tasks = [
+            (
+                image_shm.name,
+                result_shm.name,
+                shape,
+                result_shape,
+                y_start,
+                y_end,
+                dot_spacing,
+                angle_rad,
+                dot_shape,
+                vector_output,
+                engine,
+                deadline,
+            )
+            for y_start, y_end in bands
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # mapは帯の順に結果を返すため、網点データの順序は直列処理と同じ
+            dots = []
+            spills = []
+            for band_dots, spill in executor.map(_halftone_band, tasks):
+                dots.extend(band_dots)
+                if spill is not None:
+                    spills.append(spill)
+
+        for row, bits in spills:
+            shared_result[row:row + len(bits)] &= bits
+
+        result_array = shared_result.copy()
+        del shared_image, shared_result
+        return result_array, dots
+    finally:
+        image_shm.close()
+        image_shm.unlink()
+        result_shm.close()
+        result_shm.unlink()
+
+
+def _image_rows(image, y_start, y_end):
+    """画像（PIL画像またはndarray）のy_startからy_endまでの行を配列で返す"""
+    if isinstance(image, np.ndarray):
+        return image[y_start:y_end]
+    return np.asarray(image.crop((0, y_start, image.size[0], y_end)))
+
+
+def validate_options(
+    lines,
+    angle,
+    contrast,
+    dpi=300,
+    print_width=None,
+    print_height=None,
+    png_compress_level=None,
+):
+    """線数・角度・コントラスト・解像度・印刷サイズ・PNG圧縮レベルの範囲を検証"""
+    if lines < 5 or lines > 50:
+        raise click.ClickException("線数は5-50の範囲で指定してください")
+
+    if angle < 0 or angle > 90:
+        raise click.ClickException("角度は0-90の範囲で指定してください")
+
+    if contrast < 0.1 or contrast > 3.0:
+        raise click.ClickException("コントラストは0.1-3.0の範囲で指定してください")
+
+    if dpi <= 0:
+        raise click.ClickException("解像度は0より大きい値で指定してください")
+
+    for length in (print_width, print_height):
+        if length is not None and length <= 0:
+            raise click.ClickException("印刷サイズは0より大きい値で指定してください")
+
+    if png_compress_level is not None and not 0 <= png_compress_level <= 9:
+        raise click.ClickException("PNG圧縮レベルは0-9の範囲で指定してください")
+
+
+def default_output_path(input_path, format_type="PNG", body_color="white"):
+    """入力ファイル名から出力ファイル名を生成"""
+    name, _ = os.path.splitext(input_path)
+    if format_type.upper() == "AI":
+        ext = "svg"  # AI互換SVG
+    else:
+        ext = format_type.lower()
+    return f"{name}_silkscreen_{body_color}.{ext}"
+
+
+def load_jobs(jobs_path, defaults=None):
+    """ジョブファイル（JSONまたはCSV）を読み込み、ジョブのリストを返す
+
+    各ジョブはinput・output（省略可）と変換パラメーターを持つ。
+    defaults（convert_imageの引数名 → 値）は各ジョブの既定値となり、
+    ジョブ側で指定したパラメーターが優先される。
+    相対パスはジョブファイルのあるフォルダを基準に解決する。
+    """
+    try:
+        # Excelで保存したCSVのBOMは読み飛ばす
+        with open(jobs_path, newline="", encoding="utf-8-sig") as f:
+            if jobs_path.lower().endswith(".csv"):
+                entries = list(csv.DictReader(f))
+            else:
+                entries = json.load(f)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(f"ジョブファイルの読み込みに失敗しました: {e}")
+
+    if isinstance(entries, dict):
+        entries = entries.get("jobs", [])
+    if not isinstance(entries, list) or not entries:
+        raise click.ClickException("ジョブファイルにジョブがありません")
+
+    base_dir = os.path.dirname(os.path.abspath(jobs_path))
+    return [
+        _normalize_job(entry, number, base_dir, defaults)
+        for number, entry in enumerate(entries, 1)
+    ]
+
+
+def _parse_flag(value):
+    """ジョブファイルの真偽値（true/false, yes/no, 1/0）を解釈"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(value)
+
+
+def _normalize_job(entry, number, base_dir, defaults=None):
+    """ジョブ1件分の入力を検証し、convert_imageの引数に揃える"""
+    if not isinstance(entry, dict) or not entry.get("input"):
+        raise click.ClickException(f"ジョブ{number}: inputを指定してください")
+    if None in entry:
+        # csv.DictReaderはヘッダーより多いセルをキーNoneにまとめる
+        raise click.ClickException(f"ジョブ{number}: 列数がヘッダーより多い行です")
+    for key in ("input", "output"):
+        if entry.get(key) is not None and not isinstance(entry[key], str):
+            raise click.ClickException(
+                f"ジョブ{number}: {key}はファイルパスの文字列で指定してください"
+            )
+    if not isinstance(entry.get("params") or {}, dict):
+        raise click.ClickException(
+            f"ジョブ{number}: paramsはパラメーター名と値の組で指定してください"
+        )
+
+    values = dict(entry.get("params") or {})
+    values.update(
+        (key, value)
+        for key, value in entry.items()
+        if key not in ("input", "output", "params")
+    )
+
+    params = {}
+    for key, value in values.items():
+        key = key.replace("-", "_")
+        key = JOB_PARAM_ALIASES.get(key, key)
+        if key not in JOB_PARAMS:
+            raise click.ClickException(f"ジョブ{number}: 不明なパラメーターです: {key}")
+        if value is None or value == "":
+            continue
+        try:
+            if JOB_PARAMS[key] is bool:
+                params[key] = _parse_flag(value)
+            else:
+                params[key] = JOB_PARAMS[key](value)
+        except (TypeError, ValueError):
+            raise click.ClickException(
+                f"ジョブ{number}: {key}の値が不正です: {value}"
+            )
+
+    params = {
+        **{
+            key: value
+            for key, value in (defaults or {}).items()
+            if value is not None
+        },
+        **params,
+    }
+    params["format_type"] = params.get("format_type", "PNG").upper()
+    choices = {
+        "dot_shape": DOT_SHAPES,
+        "format_type": OUTPUT_FORMATS,
+        "body_color": BODY_COLORS,
+        "encode_preset": list(ENCODER_PRESETS),
+        "tiff_compression": list(TIFF_COMPRESSIONS),
+        "engine": HALFTONE_ENGINES,
+    }
+    for key, allowed in choices.items():
+        if key in params and params[key] not in allowed:
+            raise click.ClickException(
+                f"ジョブ{number}: {key}は{'/'.join(allowed)}から指定してください"
+            )
+    try:
+        validate_options(
+            params.get("lines", 15),
+            params.get("angle", 45),
+            params.get("contrast", 1.0),
+            params.get("dpi", 300),
+            params.get("print_width"),
+            params.get("print_height"),
+            params.get("png_compress_level"),
+        )
+    except click.ClickException as e:
+        raise click.ClickException(f"ジョブ{number}: {e.message}")
+
+    input_path = os.path.join(base_dir, entry["input"])
+    if entry.get("output"):
+        output_path = os.path.join(base_dir, entry["output"])
+    else:
+        output_path = default_output_path(
+            input_path,
+            params["format_type"],
+            params.get("body_color", "white"),
+        )
+
+    return {
+        "index": number,
+        "input": input_path,
+        "output": output_path,
+        "params": params,
+    }
+
+
+def run_jobs(jobs, workers=None, budget=None):
+    """ジョブを入力画像ごとにまとめて実行し、ジョブ順の結果を返す
+
+    同じ入力画像のジョブは1つのワーカーで実行し、画像のデコードと
+    グレースケール変換は1回だけ行う。budget（JobBudget）を指定すると
+    ジョブごとに見積もりと処理時間の上限を適用する。
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(os.path.abspath(job["input"]), []).append(job)
+    tasks = [(group, budget) for group in groups.values()]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        group_results = [_run_job_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            group_results = list(executor.map(_run_job_group, tasks))
+
+    results = [result for group in group_results for result in group]
+    return sorted(results, key=lambda result: result["index"])
+
+
+def _run_job_group(task):
+    """ワーカープロセス用: 同じ入力画像のジョブをまとめて実行"""
+    jobs, budget = task
+    converter = SilkscreenConverter()
+    input_path = jobs[0]["input"]
+
+    def result(job, status, seconds=0.0, error=None, size=None, plan=None,
+               decisions=None):
+        return {
+            "index": job["index"],
+            "input": job["input"],
+            "output": job["output"],
+            "status": status,
+            "error": error,
+            "decode_seconds": decode_seconds,
+            "seconds": seconds,
+            "width": size[0] if size else None,
+            "height": size[1] if size else None,
+            "decisions": plan["decisions"] if plan else decisions or [],
+        }
+
+    # 1. 各ジョブの出力サイズを見積もる（予算超過のジョブは拒否）
+    decode_seconds = 0.0
+    start = time.perf_counter()
+    try:
+        original_size = converter.image_size(input_path)
+    except Exception as e:
+        return [result(job, "error", error=str(e)) for job in jobs]
+
+    planned = []
+    results = []
+    for job in jobs:
+        params = job["params"]
+        target = print_size_to_pixels(
+            params.get("print_width"),
+            params.get("print_height"),
+            params.get("dpi", 300),
+        )
+        size = (
+            original_size if target is None
+            else fit_size(original_size, target)
+        )
+        plan = None
+        if budget is not None:
+            try:
+                plan = budget.plan(
+                    size,
+                    params.get("lines", 15),
+                    params.get("format_type", "PNG"),
+                    params.get("engine", "packed"),
+                )
+            except BudgetExceededError as e:
+                results.append(
+                    result(job, "rejected", error=e.message,
+                           decisions=e.decisions)
+                )
+                continue
+            size = plan["size"]
+        planned.append((job, size, plan))
+    if not planned:
+        return results
+
+    # 2. 全ジョブに必要なサイズで1回だけデコード
+    try:
+        decode_size = max(size for _, size, _ in planned)
+        source = converter.load_grayscale(
+            input_path, None if decode_size == original_size else decode_size
+        )
+    except Exception as e:
+        decode_seconds = time.perf_counter() - start
+        return results + [
+            result(job, "error", error=str(e), plan=plan)
+            for job, _, plan in planned
+        ]
+    decode_seconds = time.perf_counter() - start
+
+    # 3. ジョブごとに必要なサイズへ縮小して変換
+    for job, size, plan in planned:
+        start = time.perf_counter()
+        params = {
+            key: value
+            for key, value in job["params"].items()
+            if key not in ("print_width", "print_height")
+        }
+        if plan is not None:
+            params["engine"] = plan["engine"]
+            params["vector_output"] = plan["vector_output"]
+            converter.deadline = budget.deadline()
+        try:
+            gray_image = source
+            if size != source.size:
+                gray_image = source.resize(size, Image.LANCZOS)
+            output_dir = os.path.dirname(job["output"])
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            converter.convert_image(gray_image, job["output"], **params)
+            results.append(
+                result(job, "ok", time.perf_counter() - start, size=size,
+                       plan=plan)
+            )
+        except JobTimeoutError as e:
+            click.echo(f"⏱️  中断 (ジョブ{job['index']}): {e.message}")
+            results.append(
+                result(job, "timeout", time.perf_counter() - start,
+                       e.message, plan=plan)
+            )
+        except Exception as e:
+            click.echo(f"❌ エラー (ジョブ{job['index']}): {e}")
+            results.append(
+                result(job, "error", time.perf_counter() - start, str(e),
+                       plan=plan)
+            )
+        finally:
+            converter.deadline = None
+    return results
+
+
+def write_job_report(results, report_path):
+    """ジョブごとの結果と処理時間をJSONまたはCSVで書き出す"""
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        if report_path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            for result in results:
+                writer.writerow(
+                    dict(result, decisions="; ".join(result["decisions"]))
+                )
+        else:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def compare_engines(
+    image,
+    lines=15,
+    angle=45,
+    dot_shape="circle",
+    contrast=1.0,
+    brightness=0,
+    body_color="white",
+    engines=None,
+):
+    """参照実装と高速化エンジンの出力を比較し、速度比を計測
+
+    各エンジンについて、モノクロ2階調の出力が完全一致するか、
+    網点データ（PDF/AI出力の元）が一致するかと、参照実装に対する
+    速度比を返す。
+    """
+    converter = SilkscreenConverter()
+    gray_image = converter.adjust_image(
+        converter.to_grayscale(image), contrast, brightness
+    )
+
+    def run(options):
+        start = time.perf_counter()
+        result = converter.halftone_bitmap(
+            gray_image,
+            lines,
+            angle,
+            dot_shape,
+            body_color,
+            vector_output=True,
+            **options,
+        )
+        return result, converter.dot_data, time.perf_counter() - start
+
+    reference, reference_dots, reference_seconds = run({"engine": "reference"})
+
+    results = []
+    for name, options in (engines or OPTIMIZED_ENGINES).items():
+        result, dots, seconds = run(options)
+        results.append(
+            {
+                "engine": name,
+                "identical": (
+                    result.size == reference.size
+                    and result.tobytes() == reference.tobytes()
+                ),
+                "dot_data_equal": dots == reference_dots,
+                "seconds": seconds,
+                "reference_seconds": reference_seconds,
+                "speedup": reference_seconds / max(seconds, 1e-9),
+            }
+        )
+    return results
+
+
+def merge_touching_dots(dot_data):
+    """接している網点をまとめ、(単独の網点, 複合パス) を返す
+
+    網点は網点間隔の格子に並び、サイズは網点間隔以下のため、接するのは
+    最大サイズ（網点間隔と同じ）の網点が上下左右に並んだ場合だけである。
+    squareとlineは接する網点の和集合の輪郭を追跡する。点で接するだけの
+    circleとdiamondは和集合の輪郭が網点の輪郭そのものなので、接する
+    網点の輪郭を1つの複合パスにまとめる。
+
+    複合パスは {"loops": [[(x, y), ...], ...], "circles": [(x, y, r), ...]}
+    で、画像座標（左上原点）の閉じた折れ線と円を表す。塗りはPDF/AIとも
+    nonzero規則で、外周は時計回り、穴は反時計回りとする。
+    save_pdf・save_ai・BatchPdfWriterはmerge_contoursの指定時にこれを使う。
+    """
+    if not dot_data:
+        return [], []
+
+    shape = dot_data[0]["shape"]
+    count = len(dot_data)
+    xs = np.fromiter((dot["x"] for dot in dot_data), np.int64, count)
+    ys = np.fromiter((dot["y"] for dot in dot_data), np.int64, count)
+    sizes = np.fromiter((dot["size"] for dot in dot_data), np.int64, count)
+
+    # 1網点分ずれた位置に同じサイズの網点があれば接している
+    size = int(sizes.max())
+    full = np.nonzero(sizes == size)[0]
+    stride = int(xs.max()) + 2 * size + 1
+    keys = ys[full] * stride + xs[full]
+    sorted_keys = np.sort(keys)
+
+    def present(queries):
+        index = np.searchsorted(sorted_keys, queries)
+        index = np.minimum(index, len(sorted_keys) - 1)
+        return sorted_keys[index] == queries
+
+    touching = present(keys + size) | present(keys - size)
+    if shape != "line":
+        touching |= present(keys + size * stride)
+        touching |= present(keys - size * stride)
+    merged = full[touching]
+    if len(merged) == 0:
+        return list(dot_data), []
+
+    keep = np.ones(count, dtype=bool)
+    keep[merged] = False
+    dots = [dot for dot, kept in zip(dot_data, keep.tolist()) if kept]
+
+    # 接している網点を格子上のマスクにし、上下左右につながる塊に分ける
+    x0, y0 = int(xs[merged].min()), int(ys[merged].min())
+    columns = (xs[merged] - x0) // size
+    rows = (ys[merged] - y0) // size
+    mask = np.zeros((rows.max() + 1, columns.max() + 1), dtype=bool)
+    mask[rows, columns] = True
+    run_rows, run_starts, run_ends = _mask_runs(mask)
+    if shape == "line":
+        # lineは上下の網点と接しないため、横に並んだ1列が1つの塊
+        run_labels = np.arange(len(run_rows))
+    else:
+        run_labels = _label_runs(run_rows, run_starts, run_ends)
+    starts = np.zeros(mask.shape, dtype=np.int64)
+    starts[run_rows, run_starts] = 1
+    cell_labels = run_labels[np.cumsum(starts).reshape(mask.shape) - 1]
+
+    groups = [[] for _ in range(int(run_labels.max()) + 1)]
+    half = size / 2
+    if shape == "square":
+        points, lengths, labels = _trace_cell_outlines(mask, cell_labels)
+        coordinates = (points * size + [x0 - half, y0 - half]).tolist()
+        offset = 0
+        for label, length in zip(labels, lengths):
+            groups[label].append(coordinates[offset:offset + length])
+            offset += length
+    elif shape == "line":
+        for label, (row, start, end) in enumerate(
+            zip(run_rows.tolist(), run_starts.tolist(), run_ends.tolist())
+        ):
+            left = x0 - half + start * size
+            right = x0 - half + end * size
+            top = y0 + row * size - size * 0.15
+            bottom = y0 + row * size + size * 0.15
+            groups[label].append(
+                [(left, top), (right, top), (right, bottom), (left, bottom)]
+            )
+    else:
+        labels = cell_labels[rows, columns].tolist()
+        for label, x, y in zip(
+            labels, xs[merged].tolist(), ys[merged].tolist()
+        ):
+            if shape == "circle":
+                groups[label].append((x, y, half))
+            else:
+                groups[label].append(
+                    [(x, y - half), (x + half, y), (x, y + half), (x - half, y)]
+                )
+
+    key = "circles" if shape == "circle" else "loops"
+    paths = [{"loops": [], "circles": [], key: group} for group in groups]
+    return dots, paths
+
+
+def _mask_runs(mask):
+    """マスクの行ごとの連続区間 (行, 開始列, 終了列+1) を返す"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    step = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(step == 1)
+    _, run_ends = np.nonzero(step == -1)
+    return run_rows, run_starts, run_ends
+
+
+def _label_runs(run_rows, run_starts, run_ends):
+    """上下の行で重なる区間を同じ塊とし、区間ごとの塊番号を返す"""
+    rows = run_rows.tolist()
+    starts = run_starts.tolist()
+    ends = run_ends.tolist()
+    parent = list(range(len(rows)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    previous = (0, 0)
+    index = 0
+    while index < len(rows):
+        row_end = index
+        while row_end < len(rows) and rows[row_end] == rows[index]:
+            row_end += 1
+        low, high = previous
+        if high > low and rows[low] == rows[index] - 1:
+            for run in range(index, row_end):
+                while low < high and ends[low] <= starts[run]:
+                    low += 1
+                above = low
+                while above < high and starts[above] < ends[run]:
+                    parent[find(above)] = find(run)
+                    above += 1
+        previous = (index, row_end)
+        index = row_end
+
+    roots = np.array([find(run) for run in range(len(rows))], dtype=np.int64)
+    return np.unique(roots, return_inverse=True)[1].reshape(-1)
+
+
+def _trace_cell_outlines(mask, cell_labels):
+    """塗りつぶしたセルの境界を塊ごとに閉じた折れ線として追跡
+
+    格子点 (列, 行) を追跡順に並べた配列、折れ線ごとの頂点数と
+    塊番号を返す。外周は時計回り、穴は反時計回り（画像座標）になる。
+    """
+    height, width = mask.shape
+    padded = np.zeros((height + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = mask
+    below, above = padded[1:, 1:-1], padded[:-1, 1:-1]
+    right, left = padded[1:-1, 1:], padded[1:-1, :-1]
+
+    # 向き付きの辺を直線ごとにまとめた線分（始点, 終点, 接するセル）
+    r, c0, c1 = _mask_runs(below & ~above)  # 上辺: 左→右
+    top = (c0, r, c1, r, r, c0)
+    r, c0, c1 = _mask_runs(above & ~below)  # 下辺: 右→左
+    bottom = (c1, r, c0, r, r - 1, c0)
+    c, r0, r1 = _mask_runs((left & ~right).T)  # 右辺: 上→下
+    right_side = (c, r0, c, r1, r0, c - 1)
+    c, r0, r1 = _mask_runs((right & ~left).T)  # 左辺: 下→上
+    left_side = (c, r1, c, r0, r0, c)
+    start_x, start_y, end_x, end_y, cell_rows, cell_columns = (
+        np.concatenate(parts)
+        for parts in zip(top, bottom, right_side, left_side)
+    )
+
+    # 各線分の終点から始まる同じ塊の線分を次の線分とする
+    # （角で接する点では、入る線分と出る線分を順に対応させる）
+    labels = cell_labels[cell_rows, cell_columns]
+    stride = width + 1
+    label_count = int(labels.max()) + 1
+    start_keys = (start_y * stride + start_x) * label_count + labels
+    end_keys = (end_y * stride + end_x) * label_count + labels
+    start_order = np.argsort(start_keys, kind="stable")
+    end_order = np.argsort(end_keys, kind="stable")
+    sorted_ends = end_keys[end_order]
+    rank = np.empty_like(end_order)
+    rank[end_order] = np.arange(len(end_order)) - np.searchsorted(
+        sorted_ends, sorted_ends
+    )
+    following = start_order[
+        np.searchsorted(start_keys[start_order], end_keys) + rank
+    ].tolist()
+
+    # 線分の巡回を折れ線として取り出す
+    visited = bytearray(len(following))
+    order = []
+    lengths = []
+    firsts = []
+    for first in range(len(following)):
+        if visited[first]:
+            continue
+        segment = first
+        count = 0
+        while not visited[segment]:
+            visited[segment] = 1
+            order.append(segment)
+            segment = following[segment]
+            count += 1
+        lengths.append(count)
+        firsts.append(first)
+
+    points = np.stack([start_x[order], start_y[order]], axis=1)
+    return points, lengths, labels[firsts].tolist()
+
+
+def _svg_path_data(path):
+    """複合パスをSVGのパスデータに変換"""
+    commands = []
+    for loop in path["loops"]:
+        points = [f"{x:g},{y:g}" for x, y in loop]
+        commands.append(f"M{points[0]}L{' '.join(points[1:])}Z")
+    for x, y, radius in path["circles"]:
+        commands.append(
+            f"M{x - radius:g},{y:g}"
+            f"a{radius:g},{radius:g} 0 1,0 {2 * radius:g},0"
+            f"a{radius:g},{radius:g} 0 1,0 {-2 * radius:g},0Z"
+        )
+    return "".join(commands)
+
+
+def rasterize_vector(dots, paths, size, samples=4):
+    """網点と複合パスを1画素あたりsamples×samples点で2値化（検証用）
+
+    PDF/AIと同じ図形の定義で各サンプル点が塗られるかを判定する。
+    サンプル点は図形の境界にちょうど乗らないよう、わずかにずらす。
+    複合パス同士は重ならないため、折れ線の回転数はまとめて数える。
+    """
+    width, height = size
+    xs = (np.arange(width * samples) + 0.5) / samples + 1e-6
+    ys = (np.arange(height * samples) + 0.5) / samples + 2e-6
+    ink = np.zeros((len(ys), len(xs)), dtype=bool)
+
+    def fill(x, y, half, shape):
+        x_range = slice(
+            np.searchsorted(xs, x - half), np.searchsorted(xs, x + half, "right")
+        )
+        y_range = slice(
+            np.searchsorted(ys, y - half), np.searchsorted(ys, y + half, "right")
+        )
+        dx = np.abs(xs[x_range] - x)[None, :]
+        dy = np.abs(ys[y_range] - y)[:, None]
+        if shape == "circle":
+            inside = dx**2 + dy**2 <= half**2
+        elif shape == "square":
+            inside = (dx <= half) & (dy <= half)
+        elif shape == "diamond":
+            inside = dx + dy <= half
+        else:
+            inside = (dx <= half) & (dy <= half * 0.3)
+        ink[y_range, x_range] |= inside
+
+    for dot in dots:
+        fill(dot["x"], dot["y"], dot["size"] / 2, dot["shape"])
+
+    winding = np.zeros((len(ys), len(xs) + 1), dtype=np.int32)
+    for path in paths:
+        for x, y, radius in path["circles"]:
+            fill(x, y, radius, "circle")
+        for loop in path["loops"]:
+            for (x1, y1), (x2, y2) in zip(loop, loop[1:] + loop[:1]):
+                if y1 == y2:
+                    continue
+                low = np.searchsorted(ys, min(y1, y2))
+                high = np.searchsorted(ys, max(y1, y2))
+                rows = np.arange(low, high)
+                crossing = x1 + (ys[rows] - y1) * (x2 - x1) / (y2 - y1)
+                columns = np.searchsorted(xs, crossing, "right")
+                np.add.at(winding, (rows, columns), 1 if y2 > y1 else -1)
+    ink |= np.cumsum(winding, axis=1)[:, :-1] != 0
+    return ink
+
+
+def compare_vector_merge(
+    image,
+    lines=15,
+    angle=45,
+    dot_shape="circle",
+    contrast=1.0,
+    brightness=0,
+    body_color="white",
+    dpi=300,
+    samples=4,
+):
+    """網点ごとの出力と輪郭統合した出力を比較
+
+    要素数の削減率、rasterize_vectorで2値化した結果の不一致率
+    （MERGE_TOLERANCE以下であること）と、PDF/AIそれぞれの
+    書き出し時間・ファイルサイズを返す。
+    """
+    converter = SilkscreenConverter()
+    final_image = converter.render_image(
+        converter.to_grayscale(image),
+        lines,
+        angle,
+        dot_shape,
+        contrast,
+        brightness,
+        body_color,
+        vector_output=True,
+    )
+    dot_data = converter.dot_data
+    dots, paths = merge_touching_dots(dot_data)
+    reference = rasterize_vector(dot_data, [], final_image.size, samples)
+    merged = rasterize_vector(dots, paths, final_image.size, samples)
+
+    result = {
+        "dots": len(dot_data),
+        "elements": len(dots) + len(paths),
+        "reduction": 1 - (len(dots) + len(paths)) / max(len(dot_data), 1),
+        "mismatch": float(np.mean(reference != merged)),
+    }
+    savers = {"PDF": converter.save_pdf, "AI": converter.save_ai}
+    if not PDF_AVAILABLE:
+        del savers["PDF"]
+    with tempfile.TemporaryDirectory() as directory:
+        for format_type, save in savers.items():
+            timings = {}
+            for merge_contours in (False, True):
+                path = os.path.join(directory, f"{merge_contours}.out")
+                start = time.perf_counter()
+                save(final_image, path, dpi, merge_contours=merge_contours)
+                timings[merge_contours] = (
+                    time.perf_counter() - start,
+                    os.path.getsize(path),
+                )
+            result[format_type] = {
+                "seconds": timings[False][0],
+                "merged_seconds": timings[True][0],
+                "bytes": timings[False][1],
+                "merged_bytes": timings[True][1],
+            }
+    return result
+
+
+def estimate_cost(
+    size, lines, format_type="PNG", engine="packed", vector_output=None
+):
+    """画像サイズ・線数・出力形式から処理コストを見積もる
+
+    網点数はすべてのセルに網点がある場合の上限で見積もる。
+    """
+    width, height = size
+    pixels = width * height
+    dot_spacing = max(2, int(72 / lines))
+    dots = math.ceil(width / dot_spacing) * math.ceil(height / dot_spacing)
+    format_type = format_type.upper()
+    if vector_output is None:
+        vector_output = format_type in ["AI", "PDF"]
+
+    seconds = pixels * ENGINE_SECONDS_PER_PIXEL[engine]
+    memory = pixels * ENGINE_BYTES_PER_PIXEL[engine]
+    if vector_output:
+        seconds += dots * VECTOR_SECONDS_PER_DOT[format_type]
+        memory += dots * VECTOR_BYTES_PER_DOT[format_type]
+    else:
+        seconds += pixels * RASTER_SECONDS_PER_PIXEL
+
+    return {
+        "pixels": pixels,
+        "dots": dots,
+        "memory_bytes": int(memory),
+        "seconds": seconds,
+    }
+
+
+def print_size_to_pixels(print_width=None, print_height=None, dpi=300):
+    """印刷サイズ（mm）と解像度から必要なピクセル数を計算"""
+    if print_width is None and print_height is None:
+        return None
+
+    def to_pixels(length_mm):
+        if length_mm is None:
+            return None
+        return max(1, int(round(length_mm / 25.4 * dpi)))
+
+    return (to_pixels(print_width), to_pixels(print_height))
+
+
+def fit_size(size, target_size):
+    """縦横比を保ったままtarget_sizeに収まるサイズを返す（拡大はしない）"""
+    width, height = size
+    target_width, target_height = target_size
+    scale = 1.0
+    if target_width is not None:
+        scale = min(scale, target_width / width)
+    if target_height is not None:
+        scale = min(scale, target_height / height)
+    if scale >= 1.0:
+        return size
+    return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+
+def benchmark_encoders(images, repeat=3):
+    """1bit網点画像のエンコード時間とファイルサイズを計測
+
+    各形式・圧縮方式について、repeat回のうち最短の時間と
+    出力バイト数の合計を返す。
+    """
+    candidates = [("TIFF", {"tiff_compression": c}) for c in TIFF_COMPRESSIONS]
+    candidates += [
+        ("PNG", {"png_compress_level": level}) for level in (1, 6, 9)
+    ]
+
+    converter = SilkscreenConverter()
+    results = []
+    for format_type, settings in candidates:
+        seconds = 0.0
+        size = 0
+        for image in images:
+            options = converter.encoder_options(image, format_type, **settings)
+            best = None
+            for _ in range(repeat):
+                buffer = BytesIO()
+                start = time.perf_counter()
+                image.save(buffer, format=format_type, **options)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            seconds += best
+            size += buffer.tell()
+        results.append(
+            {
+                "format": format_type,
+                "settings": settings,
+                "seconds": seconds,
+                "bytes": size,
+            }
+        )
+    return results
+
+
+def parse_sheet_size(value):
+    """シートサイズ（A3などの規格名、または幅x高さmm）をポイントに変換"""
+    if value is None:
+        return None
+    if not PDF_AVAILABLE:
+        raise click.ClickException(
+            "PDF出力にはreportlabが必要です: pip install reportlab"
+        )
+    name = value.strip().upper()
+    if hasattr(pagesizes, name) and name.isalnum():
+        return getattr(pagesizes, name)
+    try:
+        width_mm, height_mm = (float(v) for v in name.split("X"))
+    except ValueError:
+        raise click.BadParameter(
+            f"シートサイズはA3または297x420(mm)の形式で指定してください: {value}"
+        )
+    return (width_mm * 72 / 25.4, height_mm * 72 / 25.4)
+
+
+def parse_grid(value):
+    """面付けの列数x行数（例: 2x3）を解析"""
+    try:
+        columns, rows = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise click.BadParameter(
+            f"面付けは列数x行数（例: 2x3）で指定してください: {value}"
+        )
+    if columns < 1 or rows < 1:
+        raise click.BadParameter("面付けの列数・行数は1以上を指定してください")
+    return columns, rows
+
 
 @click.command()
-@click.argument("input_path", type=click.Path(exists=True))
+@click.argument("input_path", required=False, type=click.Path(exists=True))
 @click.option(
     "-o", "--output", "output_path", help="出力ファイルパス（省略時は自動生成）"
 )
@@ -433,7 +2557,7 @@ class SilkscreenConverter:
 @click.option(
     "--shape",
     "dot_shape",
-    type=click.Choice(["circle", "square", "diamond", "line"]),
+    type=click.Choice(DOT_SHAPES),
     default="circle",
     help="網点形状 (デフォルト: circle)",
 )
@@ -447,10 +2571,24 @@ class SilkscreenConverter:
     "--brightness", default=0, type=int, help="明度調整 (-50 to 50, デフォルト: 0)"
 )
 @click.option("--dpi", default=300, type=int, help="出力解像度 (デフォルト: 300)")
+@click.option(
+    "--print-width",
+    "print_width",
+    default=None,
+    type=float,
+    help="印刷幅(mm)。指定時は必要な解像度まで縮小して読み込む",
+)
+@click.option(
+    "--print-height",
+    "print_height",
+    default=None,
+    type=float,
+    help="印刷高さ(mm)。指定時は必要な解像度まで縮小して読み込む",
+)
 @click.option(
     "--format",
     "format_type",
-    type=click.Choice(["PNG", "TIFF", "PDF", "AI"]),
+    type=click.Choice(OUTPUT_FORMATS),
     default="PNG",
     help="出力形式 (デフォルト: PNG)",
 )
@@ -458,10 +2596,103 @@ class SilkscreenConverter:
 @click.option(
     "--body-color",
     "body_color",
-    type=click.Choice(["white", "black"]),
+    type=click.Choice(BODY_COLORS),
     default="white",
     help="Tシャツのボディ色 (デフォルト: white)",
 )
+@click.option(
+    "--merge-output",
+    "merge_output",
+    help="バッチ結果を1つのマルチページPDFに書き出す（--batch時）",
+)
+@click.option(
+    "--impose",
+    "impose",
+    help="マルチページPDFをシートに面付け（列数x行数, 例: 2x2）",
+)
+@click.option(
+    "--sheet-size",
+    "sheet_size",
+    help="面付けシートのサイズ（A3などの規格名、または297x420(mm)）",
+)
+@click.option(
+    "--encode-preset",
+    "encode_preset",
+    type=click.Choice(list(ENCODER_PRESETS)),
+    default="balanced",
+    help="PNG/TIFFの圧縮プリセット (デフォルト: balanced)",
+)
+@click.option(
+    "--tiff-compression",
+    "tiff_compression",
+    type=click.Choice(list(TIFF_COMPRESSIONS)),
+    default=None,
+    help="TIFFの圧縮方式（プリセットより優先）",
+)
+@click.option(
+    "--png-level",
+    "png_compress_level",
+    type=click.IntRange(0, 9),
+    default=None,
+    help="PNGの圧縮レベル 0-9（プリセットより優先）",
+)
+@click.option(
+    "--jobs-file",
+    "jobs_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="ファイルごとに設定の異なるジョブ一覧（JSON/CSV）を一括実行",
+)
+@click.option(
+    "--report",
+    "report_path",
+    help="ジョブごとの結果レポート（.json/.csv, デフォルト: <ジョブファイル名>_report.json）",
+)
+@click.option(
+    "--max-pixels",
+    "max_pixels",
+    default=None,
+    type=int,
+    help="1ジョブあたりの最大画素数",
+)
+@click.option(
+    "--max-memory",
+    "max_memory_mb",
+    default=None,
+    type=int,
+    help="1ジョブあたりの推定メモリ上限(MB)",
+)
+@click.option(
+    "--timeout",
+    default=None,
+    type=float,
+    help="1ジョブあたりの処理時間の上限(秒)。超えた場合は中断",
+)
+@click.option(
+    "--on-budget",
+    "budget_policy",
+    type=click.Choice(BUDGET_POLICIES),
+    default="degrade",
+    help="上限を超えるジョブの扱い（degrade: 軽量化, reject: 拒否）",
+)
+@click.option(
+    "--merge-contours",
+    "merge_contours",
+    is_flag=True,
+    help="PDF/AIで接している網点を複合パスにまとめる（要素数を削減）",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(HALFTONE_ENGINES),
+    default="packed",
+    help="網点エンジン（referenceは検証用の参照実装, デフォルト: packed）",
+)
+@click.option(
+    "--workers",
+    default=None,
+    type=int,
+    help="並列処理のワーカー数（バッチPDFはファイル単位、"
+    "単一ファイルは画像を帯に分割して並列化。デフォルト: CPUコア数/1）",
+)
 def main(
     input_path,
     output_path,
@@ -471,9 +2702,26 @@ def main(
     contrast,
     brightness,
     dpi,
+    print_width,
+    print_height,
     format_type,
     batch,
     body_color,
+    merge_output,
+    impose,
+    sheet_size,
+    encode_preset,
+    tiff_compression,
+    png_compress_level,
+    jobs_file,
+    report_path,
+    max_pixels,
+    max_memory_mb,
+    timeout,
+    budget_policy,
+    merge_contours,
+    engine,
+    workers,
 ):
     """
     シルクスクリーン用写真変換ツール（AI・PDF対応版）
@@ -491,6 +2739,11 @@ def main(
       python silkscreen_converter.py photo.jpg -o output.pdf --format PDF
       python silkscreen_converter.py photo.jpg --body-color black
       python silkscreen_converter.py images/ --batch --format AI --lines 15 --body-color white
+      python silkscreen_converter.py images/ --batch --merge-output all.pdf
+      python silkscreen_converter.py images/ --batch --merge-output f.pdf --impose 2x2
+      python silkscreen_converter.py --jobs-file orders.json --report orders_report.json
+      python silkscreen_converter.py huge.jpg --max-pixels 20000000 --timeout 60
+      python silkscreen_converter.py logo.png -o logo.pdf --format PDF --merge-contours
     """
 
     # 必要なライブラリチェック
@@ -499,6 +2752,80 @@ def main(
             "PDF出力には追加ライブラリが必要です:\n" "pip install reportlab"
         )
 
+    if workers is not None and workers < 1:
+        raise click.ClickException("ワーカー数は1以上で指定してください")
+
+    # バリデーション
+    validate_options(
+        lines,
+        angle,
+        contrast,
+        dpi,
+        print_width,
+        print_height,
+        png_compress_level,
+    )
+
+    if (impose or sheet_size) and not merge_output:
+        raise click.ClickException(
+            "--impose/--sheet-sizeは--merge-outputと併用してください"
+        )
+
+    budget = None
+    limits = [
+        limit
+        for limit in (max_pixels, max_memory_mb, timeout)
+        if limit is not None
+    ]
+    if limits:
+        if any(limit <= 0 for limit in limits):
+            raise click.ClickException("上限は0より大きい値で指定してください")
+        budget = JobBudget(max_pixels, max_memory_mb, timeout, budget_policy)
+
+    # ジョブファイル処理（コマンドラインの変換オプションは各ジョブの既定値）
+    if jobs_file:
+        jobs = load_jobs(
+            jobs_file,
+            {
+                "lines": lines,
+                "angle": angle,
+                "dot_shape": dot_shape,
+                "contrast": contrast,
+                "brightness": brightness,
+                "dpi": dpi,
+                "format_type": format_type,
+                "body_color": body_color,
+                "encode_preset": encode_preset,
+                "tiff_compression": tiff_compression,
+                "png_compress_level": png_compress_level,
+                "print_width": print_width,
+                "print_height": print_height,
+                "engine": engine,
+                "merge_contours": merge_contours,
+            },
+        )
+        click.echo(f"📋 ジョブ処理開始: {len(jobs)}件")
+        start = time.perf_counter()
+        results = run_jobs(jobs, workers, budget)
+
+        if not report_path:
+            name, _ = os.path.splitext(jobs_file)
+            report_path = f"{name}_report.json"
+        write_job_report(results, report_path)
+
+        failed = sum(1 for result in results if result["status"] != "ok")
+        click.echo(
+            f"✅ ジョブ処理完了: 成功 {len(results) - failed}件, "
+            f"失敗 {failed}件 ({time.perf_counter() - start:.1f}秒)"
+        )
+        click.echo(f"   レポート: {report_path}")
+        if failed:
+            raise click.ClickException(f"{failed}件のジョブが失敗しました")
+        return
+
+    if not input_path:
+        raise click.UsageError("INPUT_PATHまたは--jobs-fileを指定してください")
+
     converter = SilkscreenConverter()
 
     # バッチ処理
@@ -517,6 +2844,31 @@ def main(
 
         click.echo(f"📁 バッチ処理開始: {len(image_files)}ファイル")
 
+        # 1つのPDFへまとめて書き出す
+        if merge_output:
+            grid = parse_grid(impose) if impose else (1, 1)
+            sheet = parse_sheet_size(sheet_size or ("A3" if impose else None))
+            converter.convert_batch_pdf(
+                [os.path.join(input_path, f) for f in sorted(image_files)],
+                merge_output,
+                lines,
+                angle,
+                dot_shape,
+                contrast,
+                brightness,
+                dpi,
+                body_color,
+                sheet_size=sheet,
+                grid=grid,
+                workers=workers,
+                print_width=print_width,
+                print_height=print_height,
+                merge_contours=merge_contours,
+                budget=budget,
+            )
+            click.echo("✅ バッチ処理完了")
+            return
+
         for file in image_files:
             input_file = os.path.join(input_path, file)
             name, _ = os.path.splitext(file)
@@ -541,6 +2893,14 @@ def main(
                     dpi,
                     format_type,
                     body_color,
+                    encode_preset,
+                    tiff_compression,
+                    png_compress_level,
+                    print_width,
+                    print_height,
+                    engine=engine,
+                    budget=budget,
+                    merge_contours=merge_contours,
                 )
             except Exception as e:
                 click.echo(f"❌ エラー ({file}): {e}")
@@ -550,22 +2910,7 @@ def main(
 
     # 単一ファイル処理
     if not output_path:
-        name, _ = os.path.splitext(input_path)
-        if format_type.upper() == "AI":
-            ext = "svg"
-        else:
-            ext = format_type.lower()
-        output_path = f"{name}_silkscreen_{body_color}.{ext}"
-
-    # バリデーション
-    if lines < 5 or lines > 50:
-        raise click.ClickException("線数は5-50の範囲で指定してください")
-
-    if angle < 0 or angle > 90:
-        raise click.ClickException("角度は0-90の範囲で指定してください")
-
-    if contrast < 0.1 or contrast > 3.0:
-        raise click.ClickException("コントラストは0.1-3.0の範囲で指定してください")
+        output_path = default_output_path(input_path, format_type, body_color)
 
     # 変換実行
     try:
@@ -580,6 +2925,15 @@ def main(
             dpi,
             format_type,
             body_color,
+            encode_preset,
+            tiff_compression,
+            png_compress_level,
+            print_width,
+            print_height,
+            workers or 1,
+            engine,
+            budget,
+            merge_contours,
         )
 
         # 形式別の追加情報
@@ -594,6 +2948,8 @@ def main(
             click.echo("   - ベクターベースで拡大縮小可能")
             click.echo("   - 製版サービスに直接入稿可能")
 
+    except BudgetExceededError:
+        raise
     except Exception as e:
         raise click.ClickException(f"変換に失敗しました: {e}")
 
@@ -3,16 +3,46 @@
 シルクスクリーン変換ツールのユニットテスト
 """
 
+import base64
 import pytest
+import json
+import random
+import re
 import tempfile
 import os
+import time
+import zlib
+import click
 import numpy as np
 from PIL import Image
 import sys
 
 # テスト対象のモジュールをインポート
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from silkscreen_converter import SilkscreenConverter
+import silkscreen_converter
+from silkscreen_converter import (
+    MERGE_TOLERANCE,
+    OPTIMIZED_ENGINES,
+    BudgetExceededError,
+    JobBudget,
+    JobTimeoutError,
+    SilkscreenConverter,
+    _halftone_bands,
+    benchmark_encoders,
+    compare_engines,
+    compare_vector_merge,
+    estimate_cost,
+    fit_size,
+    load_jobs,
+    merge_touching_dots,
+    parse_grid,
+    parse_sheet_size,
+    print_size_to_pixels,
+    rasterize_vector,
+    run_jobs,
+    validate_options,
+    write_job_report,
+)
 
 
 class TestSilkscreenConverter:
@@ -46,6 +76,39 @@ class TestSilkscreenConverter:
         assert image.mode == 'RGB'
         assert image.size == (100, 100)
     
+    def test_load_image_reduced_jpeg(self, converter, tmp_path):
+        """印刷サイズに合わせた縮小デコードのテスト"""
+        path = tmp_path / 'large.jpg'
+        yy, xx = np.mgrid[0:400, 0:800]
+        arr = np.stack([xx * 255 // 800, yy * 255 // 400, (xx + yy) % 256], -1)
+        Image.fromarray(arr.astype(np.uint8)).save(path, quality=90)
+
+        image = converter.load_image(str(path), (200, None), mode='L')
+        assert image.mode == 'L'
+        assert image.size == (200, 100)
+
+        # フル解像度デコード後の縮小とほぼ一致すること
+        full = Image.open(path).convert('L').resize((200, 100), Image.LANCZOS)
+        diff = np.abs(np.array(image, int) - np.array(full, int))
+        assert diff.mean() < 3
+
+    def test_load_image_no_upscale(self, converter, temp_image_path):
+        """印刷サイズが画像より大きい場合は拡大しないこと"""
+        image = converter.load_image(temp_image_path, (1000, 1000))
+        assert image.size == (100, 100)
+
+    def test_convert_print_width(self, converter, temp_image_path):
+        """印刷幅指定での変換テスト"""
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+            try:
+                result = converter.convert(
+                    temp_image_path, f.name, dpi=254, print_width=5
+                )
+                assert result.size == (50, 50)
+                assert result.mode == '1'
+            finally:
+                os.unlink(f.name)
+
     def test_load_nonexistent_image(self, converter):
         """存在しない画像の読み込みテスト"""
         with pytest.raises(Exception):
@@ -98,6 +161,60 @@ class TestSilkscreenConverter:
         assert all('x' in dot and 'y' in dot and 'size' in dot 
                   for dot in converter.dot_data)
     
+    @pytest.mark.parametrize('shape', ['circle', 'square', 'diamond', 'line'])
+    def test_create_halftone_parallel_matches_serial(self, converter,
+                                                     test_image, shape):
+        """帯分割の並列網点化が直列処理と一致することのテスト"""
+        gray_image = converter.to_grayscale(test_image)
+        serial = converter.create_halftone_pattern(
+            gray_image, 15, 45, shape, vector_output=True
+        )
+        serial_dots = converter.dot_data
+        parallel = converter.create_halftone_pattern(
+            gray_image, 15, 45, shape, vector_output=True, workers=3
+        )
+        assert parallel.tobytes() == serial.tobytes()
+        assert converter.dot_data == serial_dots
+
+    def test_create_halftone_bitmap(self, converter, test_image):
+        """ビットパック網点生成のテスト"""
+        gray_image = converter.to_grayscale(test_image)
+        bitmap = converter.create_halftone_bitmap(gray_image, 15, 45)
+        assert bitmap.mode == '1'
+        assert bitmap.size == gray_image.size
+
+        expected = converter.to_monochrome_bitmap(
+            converter.create_halftone_pattern(gray_image, 15, 45)
+        )
+        assert bitmap.tobytes() == expected.tobytes()
+
+        inverted = converter.create_halftone_bitmap(
+            gray_image, 15, 45, invert=True
+        )
+        assert np.array_equal(np.array(inverted), ~np.array(bitmap))
+
+    def test_create_halftone_bitmap_small_bands(self, converter, test_image,
+                                                monkeypatch):
+        """作業領域を細かく分割しても結果が変わらないことのテスト"""
+        gray_image = converter.to_grayscale(test_image)
+        expected = converter.create_halftone_bitmap(gray_image, 20, 30)
+        monkeypatch.setattr(silkscreen_converter, 'PACKED_BAND_PIXELS', 1)
+        for workers in (1, 3):
+            bitmap = converter.create_halftone_bitmap(
+                gray_image, 20, 30, workers=workers
+            )
+            assert bitmap.tobytes() == expected.tobytes()
+
+    def test_halftone_bands(self):
+        """帯が網点間隔に揃い、画像全体を覆うことのテスト"""
+        bands = _halftone_bands(100, 4, 3)
+        assert len(bands) == 3
+        assert bands[0][0] == 0 and bands[-1][1] == 100
+        for (_, end), (start, _) in zip(bands, bands[1:]):
+            assert end == start and start % 4 == 0
+        assert _halftone_bands(100, 4, 1) == [(0, 100)]
+        assert len(_halftone_bands(6, 4, 8)) == 2
+
     def test_to_monochrome_bitmap(self, converter, test_image):
         """モノクロ2階調変換のテスト"""
         gray_image = converter.to_grayscale(test_image)
@@ -122,6 +239,55 @@ class TestSilkscreenConverter:
             assert os.path.exists(f.name)
             os.unlink(f.name)
     
+    @pytest.mark.parametrize('compression,expected', [
+        ('group4', 'group4'),
+        ('packbits', 'packbits'),
+        ('lzw', 'tiff_lzw'),
+        ('deflate', 'tiff_adobe_deflate'),
+    ])
+    def test_save_image_tiff_compression(self, converter, test_image,
+                                         compression, expected):
+        """TIFF圧縮方式の指定テスト"""
+        mono_image = converter.to_monochrome_bitmap(
+            converter.to_grayscale(test_image)
+        )
+        with tempfile.NamedTemporaryFile(suffix='.tiff', delete=False) as f:
+            try:
+                converter.save_image(mono_image, f.name, 'TIFF',
+                                     tiff_compression=compression)
+                saved_image = Image.open(f.name)
+                assert saved_image.info['compression'] == expected
+                assert saved_image.tobytes() == mono_image.tobytes()
+            finally:
+                os.unlink(f.name)
+
+    def test_encoder_options_presets(self, converter, test_image):
+        """エンコーダープリセットのテスト"""
+        mono_image = converter.to_monochrome_bitmap(
+            converter.to_grayscale(test_image)
+        )
+        assert converter.encoder_options(mono_image, 'PNG', 'fast') == {
+            'compress_level': 1
+        }
+        assert converter.encoder_options(
+            mono_image, 'PNG', 'small', png_compress_level=3
+        ) == {'compress_level': 3}
+        # Group 4は2階調以外の画像には使わない
+        assert converter.encoder_options(
+            test_image, 'TIFF', tiff_compression='group4'
+        ) == {'compression': 'packbits'}
+        with pytest.raises(Exception):
+            converter.encoder_options(mono_image, 'PNG', 'unknown')
+
+    def test_benchmark_encoders(self, converter, test_image):
+        """エンコーダー計測のテスト"""
+        mono_image = converter.to_monochrome_bitmap(
+            converter.to_grayscale(test_image)
+        )
+        results = benchmark_encoders([mono_image], repeat=1)
+        assert {r['format'] for r in results} == {'PNG', 'TIFF'}
+        assert all(r['bytes'] > 0 and r['seconds'] >= 0 for r in results)
+
     @pytest.mark.skipif(not hasattr(SilkscreenConverter, 'save_pdf'), 
                        reason="PDF support not available")
     def test_save_pdf(self, converter, test_image):
@@ -190,6 +356,487 @@ class TestSilkscreenConverter:
                         os.unlink(f.name)
 
 
+def random_engine_case(seed):
+    """乱数で画像とパラメーターの組を生成"""
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 80), rng.randint(1, 80)
+    arr = np.random.RandomState(seed).randint(0, 256, (height, width, 3))
+    if rng.random() < 0.3:
+        # ベタ・ほぼベタの画像
+        arr[:] = rng.choice([0, 8, 128, 250, 255])
+    params = {
+        'lines': rng.choice([5, 8, 10, 15, 20, 30, 36, 50]),
+        'angle': rng.randint(0, 90),
+        'dot_shape': rng.choice(['circle', 'square', 'diamond', 'line']),
+        'contrast': rng.choice([0.5, 1.0, 1.5, 3.0]),
+        'brightness': rng.randint(-50, 50),
+        'body_color': rng.choice(['white', 'black']),
+    }
+    return Image.fromarray(arr.astype(np.uint8)), params
+
+
+class TestEngineEquivalence:
+    """高速化エンジンが参照実装と同じ出力になることの差分テスト"""
+
+    @pytest.mark.parametrize('seed', range(60))
+    def test_stamp_matches_reference(self, seed, record_property):
+        """stampエンジンのランダム入力での一致"""
+        image, params = random_engine_case(seed)
+        results = compare_engines(
+            image, engines={'stamp': {'engine': 'stamp'}}, **params
+        )
+        for result in results:
+            record_property(f"{result['engine']}_speedup", result['speedup'])
+            assert result['identical'], (result, params)
+            assert result['dot_data_equal'], (result, params)
+
+    @pytest.mark.parametrize('seed', range(100, 104))
+    def test_all_engines_match_reference(self, seed, record_property):
+        """並列構成を含む全エンジンの一致"""
+        image, params = random_engine_case(seed)
+        results = compare_engines(image, **params)
+        assert [r['engine'] for r in results] == list(OPTIMIZED_ENGINES)
+        for result in results:
+            record_property(f"{result['engine']}_speedup", result['speedup'])
+            assert result['identical'], (result, params)
+            assert result['dot_data_equal'], (result, params)
+            assert result['speedup'] > 0
+
+
+def grid_dots(cells, shape='square', spacing=4):
+    """'#'が最大サイズ、'o'が小さい網点の格子から網点データを作成"""
+    dots = []
+    for row, line in enumerate(cells):
+        for column, cell in enumerate(line):
+            if cell != '.':
+                dots.append({
+                    'x': column * spacing + spacing // 2,
+                    'y': row * spacing + spacing // 2,
+                    'size': spacing if cell == '#' else spacing // 2,
+                    'shape': shape,
+                    'angle': 0.0,
+                })
+    return dots
+
+
+class TestContourMerge:
+    """接している網点の輪郭統合のテスト"""
+
+    def test_solid_block_becomes_one_outline(self):
+        """ベタ部分は1つの輪郭になり、離れた網点はそのまま残ること"""
+        dots = grid_dots(['###.o', '###..', '###.#'])
+        isolated, paths = merge_touching_dots(dots)
+        assert [(d['x'], d['y']) for d in isolated] == [(18, 2), (18, 10)]
+        assert paths == [{
+            'loops': [[[0, 0], [12, 0], [12, 12], [0, 12]]],
+            'circles': [],
+        }]
+
+    def test_hole_and_groups(self):
+        """穴のある塊と、角だけで接する塊"""
+        dots = grid_dots(['###..', '#.#..', '###..', '...##'])
+        isolated, paths = merge_touching_dots(dots)
+        assert isolated == []
+        assert [len(path['loops']) for path in paths] == [2, 1]
+        reference = rasterize_vector(dots, [], (20, 16))
+        assert np.array_equal(rasterize_vector(isolated, paths, (20, 16)),
+                              reference)
+
+    def test_line_merges_horizontally_only(self):
+        """lineは横に並んだ網点だけをまとめること"""
+        dots = grid_dots(['##.', '##.', '#..'], shape='line')
+        isolated, paths = merge_touching_dots(dots)
+        assert len(isolated) == 1
+        assert len(paths) == 2
+
+    def test_no_touching_dots(self):
+        """最大サイズでも接していなければ何もしない"""
+        dots = grid_dots(['#.#', 'ooo', '#.#'])
+        assert merge_touching_dots(dots) == (dots, [])
+        assert merge_touching_dots([]) == ([], [])
+
+    @pytest.mark.parametrize('seed', range(12))
+    def test_merged_output_matches_dots(self, seed, record_property):
+        """統合後の2値化結果が網点ごとの結果と許容差内で一致すること"""
+        image, params = random_engine_case(seed)
+        arr = np.array(image)
+        arr[: arr.shape[0] // 2] = 0  # ベタ部分を作る
+        params.pop('angle')
+        result = compare_vector_merge(Image.fromarray(arr), **params)
+        record_property('element_reduction', result['reduction'])
+        assert result['mismatch'] <= MERGE_TOLERANCE, (result, params)
+        assert result['elements'] <= result['dots']
+        for format_type in ('PDF', 'AI'):
+            assert result[format_type]['merged_bytes'] > 0
+
+    def test_save_pdf_uses_nonzero_fill(self, tmp_path):
+        """PDFの複合パスはAIと同じnonzero規則で塗ること"""
+        pytest.importorskip("reportlab")
+        arr = np.full((40, 60), 255, dtype=np.uint8)
+        arr[:20, :40] = 0
+        arr[8:12, 16:24] = 255  # 穴
+        output = tmp_path / 'merged.pdf'
+        SilkscreenConverter().convert_image(
+            Image.fromarray(arr), str(output), format_type='PDF',
+            dot_shape='square', merge_contours=True,
+        )
+        stream = re.search(rb'stream\r?\n(.*?~>)', output.read_bytes(), re.S)
+        content = zlib.decompress(base64.a85decode(stream.group(1), adobe=True))
+        assert content.count(b' l h') == 2  # 外周と穴の2つのサブパス
+        assert b'\nB\n' in content
+        assert b'B*' not in content
+
+    def test_save_ai_writes_compound_paths(self, tmp_path):
+        """AI出力で統合した輪郭がpath要素になること"""
+        arr = np.full((40, 60), 255, dtype=np.uint8)
+        arr[:20, :40] = 0
+        converter = SilkscreenConverter()
+        output = tmp_path / 'merged.ai'
+        converter.convert_image(
+            Image.fromarray(arr), str(output), format_type='AI',
+            dot_shape='square', merge_contours=True,
+        )
+        text = output.read_text()
+        assert text.count('<path') == 1
+        assert 'M0,0L40,0 40,20 0,20Z' in text
+        assert text.count('<rect') == len(converter.dot_data) - 50
+
+
+class TestBatchPdf:
+    """マルチページPDF・面付け出力のテスト"""
+
+    @pytest.fixture
+    def image_files(self, tmp_path):
+        """テスト用の画像ファイル群"""
+        paths = []
+        for i in range(3):
+            arr = np.full((60, 40, 3), 60 * i, dtype=np.uint8)
+            path = tmp_path / f"image{i}.png"
+            Image.fromarray(arr).save(path)
+            paths.append(str(path))
+        return paths
+
+    def test_multi_page_pdf(self, image_files, tmp_path):
+        """1ファイル1ページで書き出されること"""
+        pytest.importorskip("reportlab")
+        output = tmp_path / "merged.pdf"
+        written = SilkscreenConverter().convert_batch_pdf(
+            image_files, str(output), lines=15, workers=1
+        )
+        assert written == 3
+        assert output.read_bytes().count(b"/Type /Page\n") == 3
+
+    def test_imposed_sheet(self, image_files, tmp_path):
+        """面付け時はシート単位でページが作成されること"""
+        pytest.importorskip("reportlab")
+        output = tmp_path / "film.pdf"
+        SilkscreenConverter().convert_batch_pdf(
+            image_files,
+            str(output),
+            sheet_size=parse_sheet_size("A4"),
+            grid=(2, 1),
+            workers=2,
+        )
+        assert output.read_bytes().count(b"/Type /Page\n") == 2
+
+    def test_failed_file_is_skipped(self, image_files, tmp_path):
+        """読み込めないファイルはスキップして続行すること"""
+        pytest.importorskip("reportlab")
+        output = tmp_path / "merged.pdf"
+        written = SilkscreenConverter().convert_batch_pdf(
+            image_files + [str(tmp_path / "missing.png")],
+            str(output),
+            workers=1,
+        )
+        assert written == 3
+
+    def test_budget_applies_to_pages(self, image_files, tmp_path):
+        """予算を超えるページは拒否、degradeでは縮小して書き出すこと"""
+        pytest.importorskip("reportlab")
+        output = tmp_path / "merged.pdf"
+        converter = SilkscreenConverter()
+        written = converter.convert_batch_pdf(
+            image_files, str(output), workers=2,
+            budget=JobBudget(max_pixels=1000, policy='reject'),
+        )
+        assert written == 0
+
+        written = converter.convert_batch_pdf(
+            image_files, str(output), workers=1,
+            budget=JobBudget(max_pixels=1000),
+        )
+        assert written == 3
+
+    def test_parse_sheet_size(self):
+        """シートサイズの解析"""
+        pytest.importorskip("reportlab")
+        width, height = parse_sheet_size("297x420")
+        assert width == pytest.approx(297 * 72 / 25.4)
+        assert height == pytest.approx(420 * 72 / 25.4)
+        assert parse_sheet_size("a3") == pytest.approx((width, height))
+        with pytest.raises(Exception):
+            parse_sheet_size("large")
+
+    def test_print_size_to_pixels(self):
+        """印刷サイズからピクセル数への変換"""
+        assert print_size_to_pixels(None, None, 300) is None
+        assert print_size_to_pixels(25.4, None, 300) == (300, None)
+        assert fit_size((600, 400), (300, None)) == (300, 200)
+        assert fit_size((600, 400), (None, 100)) == (150, 100)
+        assert fit_size((600, 400), (900, 900)) == (600, 400)
+
+    def test_parse_grid(self):
+        """面付け指定の解析"""
+        assert parse_grid("2x3") == (2, 3)
+        with pytest.raises(Exception):
+            parse_grid("0x2")
+        with pytest.raises(Exception):
+            parse_grid("two")
+
+
+class TestJobs:
+    """ジョブファイル処理のテスト"""
+
+    @pytest.fixture
+    def jobs_dir(self, tmp_path):
+        """テスト用の入力画像"""
+        for name in ('a.png', 'b.png'):
+            arr = np.tile(np.arange(0, 240, 3, dtype=np.uint8), (60, 1))
+            Image.fromarray(arr).save(tmp_path / name)
+        return tmp_path
+
+    def test_load_jobs_json(self, jobs_dir):
+        """JSONジョブファイルの読み込み"""
+        path = jobs_dir / 'jobs.json'
+        path.write_text(json.dumps({'jobs': [
+            {'input': 'a.png', 'output': 'out/a.tiff',
+             'params': {'lines': '10', 'shape': 'square', 'format': 'tiff'}},
+            {'input': 'b.png', 'body-color': 'black'},
+        ]}))
+        jobs = load_jobs(str(path))
+        assert jobs[0]['output'] == str(jobs_dir / 'out' / 'a.tiff')
+        assert jobs[0]['params'] == {
+            'lines': 10, 'dot_shape': 'square', 'format_type': 'TIFF'
+        }
+        assert jobs[1]['output'] == str(jobs_dir / 'b_silkscreen_black.png')
+
+    def test_load_jobs_csv(self, jobs_dir):
+        """CSVジョブファイルの読み込み（空欄は既定値）"""
+        path = jobs_dir / 'jobs.csv'
+        path.write_text('input,output,lines,angle\na.png,a.png.out.png,,30\n')
+        jobs = load_jobs(str(path))
+        assert jobs[0]['params'] == {'angle': 30, 'format_type': 'PNG'}
+
+    @pytest.mark.parametrize('entry', [
+        {'output': 'x.png'},
+        {'input': 'a.png', 'lines': 100},
+        {'input': 'a.png', 'shape': 'star'},
+        {'input': 'a.png', 'unknown': 1},
+        {'input': 'a.png', 'angle': 'abc'},
+        {'input': 'a.png', 'print_width': -10},
+        {'input': 'a.png', 'print_height': 0},
+        {'input': 'a.png', 'dpi': 0},
+        {'input': 'a.png', 'png_level': 42},
+        {'input': 'a.png', 'params': [1, 2]},
+        {'input': 5},
+        {'input': 'a.png', 'output': ['x.png']},
+    ])
+    def test_load_jobs_invalid(self, jobs_dir, entry):
+        """不正なジョブはエラーになること"""
+        path = jobs_dir / 'jobs.json'
+        path.write_text(json.dumps([entry]))
+        with pytest.raises(click.ClickException):
+            load_jobs(str(path))
+
+    def test_run_jobs_decodes_once_per_image(self, jobs_dir, monkeypatch):
+        """同じ入力画像のデコードは1回だけで、結果はジョブ順になること"""
+        path = jobs_dir / 'jobs.json'
+        path.write_text(json.dumps([
+            {'input': 'a.png', 'output': 'out/1.png'},
+            {'input': 'b.png', 'output': 'out/2.pdf', 'format': 'PDF'},
+            {'input': 'a.png', 'output': 'out/3.svg', 'format': 'AI',
+             'print_width': 5, 'dpi': 254},
+            {'input': 'missing.png', 'output': 'out/4.png'},
+        ]))
+        decoded = []
+        load_grayscale = SilkscreenConverter.load_grayscale
+
+        def counting_load(self, input_path, target_size=None):
+            decoded.append(os.path.basename(input_path))
+            return load_grayscale(self, input_path, target_size)
+
+        monkeypatch.setattr(SilkscreenConverter, 'load_grayscale',
+                            counting_load)
+        results = run_jobs(load_jobs(str(path)), workers=1)
+
+        assert sorted(decoded) == ['a.png', 'b.png']
+        assert [r['index'] for r in results] == [1, 2, 3, 4]
+        assert [r['status'] for r in results] == ['ok', 'ok', 'ok', 'error']
+        assert (results[0]['width'], results[2]['width']) == (80, 50)
+        assert all(r['seconds'] >= 0 for r in results)
+        for name in ('1.png', '2.pdf', '3.svg'):
+            assert (jobs_dir / 'out' / name).exists()
+
+        report = jobs_dir / 'report.csv'
+        write_job_report(results, str(report))
+        assert report.read_text().startswith('index,input,output,status')
+
+    def test_load_jobs_csv_malformed(self, jobs_dir):
+        """ヘッダーより列の多い行はエラーになり、BOM付きCSVは読めること"""
+        path = jobs_dir / 'jobs.csv'
+        path.write_text('input,output\na.png,e.png,3\n')
+        with pytest.raises(click.ClickException, match='ジョブ1'):
+            load_jobs(str(path))
+
+        path.write_text('input,lines\na.png,10\n', encoding='utf-8-sig')
+        assert load_jobs(str(path))[0]['params']['lines'] == 10
+
+    def test_load_jobs_defaults(self, jobs_dir):
+        """既定値はジョブ側の指定で上書きされること"""
+        path = jobs_dir / 'jobs.json'
+        path.write_text(json.dumps([
+            {'input': 'a.png'},
+            {'input': 'b.png', 'lines': 10, 'format': 'AI'},
+        ]))
+        defaults = {'lines': 40, 'format_type': 'pdf',
+                    'merge_contours': True, 'tiff_compression': None}
+        jobs = load_jobs(str(path), defaults)
+        assert jobs[0]['params'] == {
+            'lines': 40, 'format_type': 'PDF', 'merge_contours': True
+        }
+        assert jobs[0]['output'].endswith('.pdf')
+        assert jobs[1]['params'] == {
+            'lines': 10, 'format_type': 'AI', 'merge_contours': True
+        }
+
+        with pytest.raises(Exception):
+            load_jobs(str(path), {'dpi': -1})
+
+    def test_load_jobs_flag(self, jobs_dir):
+        """真偽値のパラメーター"""
+        path = jobs_dir / 'jobs.csv'
+        path.write_text('input,merge_contours\na.png,yes\nb.png,0\n')
+        jobs = load_jobs(str(path))
+        assert [job['params']['merge_contours'] for job in jobs] == [
+            True, False
+        ]
+        path.write_text('input,merge_contours\na.png,maybe\n')
+        with pytest.raises(Exception):
+            load_jobs(str(path))
+
+    def test_run_jobs_with_budget(self, jobs_dir):
+        """予算を超えるジョブは拒否され、結果に判断が記録されること"""
+        path = jobs_dir / 'jobs.json'
+        path.write_text(json.dumps([
+            {'input': 'a.png', 'output': 'out/1.png'},
+            {'input': 'a.png', 'output': 'out/2.png',
+             'print_width': 5, 'dpi': 254},
+        ]))
+        budget = JobBudget(max_pixels=2000, policy='reject')
+        results = run_jobs(load_jobs(str(path)), workers=1, budget=budget)
+
+        assert [r['status'] for r in results] == ['rejected', 'ok']
+        assert results[0]['decisions'][0].startswith('拒否')
+        assert not (jobs_dir / 'out' / '1.png').exists()
+        assert (jobs_dir / 'out' / '2.png').exists()
+
+        report = jobs_dir / 'report.csv'
+        write_job_report(results, str(report))
+        assert '拒否' in report.read_text()
+
+
+class TestBudget:
+    """ジョブ予算（画素数・メモリ・処理時間）のテスト"""
+
+    def test_estimate_cost(self):
+        """見積もりは画素数に比例し、ベクター出力で増えること"""
+        small = estimate_cost((1000, 1000), 15)
+        large = estimate_cost((2000, 2000), 15)
+        assert large['pixels'] == 4 * small['pixels']
+        assert large['seconds'] > small['seconds']
+        assert large['memory_bytes'] > small['memory_bytes']
+
+        vector = estimate_cost((1000, 1000), 15, 'PDF')
+        raster = estimate_cost((1000, 1000), 15, 'PDF', vector_output=False)
+        assert vector['dots'] == (1000 // 4) ** 2
+        assert vector['seconds'] > raster['seconds']
+        assert vector['memory_bytes'] > raster['memory_bytes']
+        assert estimate_cost((1000, 1000), 15, engine='reference')[
+            'seconds'] > small['seconds']
+
+    def test_plan_within_budget(self):
+        """上限内ならそのまま"""
+        plan = JobBudget(max_pixels=10**6).plan((800, 600), 15)
+        assert plan['size'] == (800, 600)
+        assert plan['engine'] == 'packed'
+        assert plan['decisions'] == []
+
+    def test_plan_max_pixels(self):
+        """画素数の上限を超えると縮小、rejectでは拒否"""
+        plan = JobBudget(max_pixels=10**6).plan((4000, 3000), 15)
+        width, height = plan['size']
+        assert width * height <= 10**6
+        assert width / height == pytest.approx(4 / 3, rel=0.01)
+        assert plan['decisions'][0].startswith('縮小')
+
+        with pytest.raises(BudgetExceededError):
+            JobBudget(max_pixels=10**6, policy='reject').plan((4000, 3000), 15)
+
+    def test_plan_degrades_in_order(self):
+        """エンジン切り替え → ラスター埋め込み → 縮小の順に軽くすること"""
+        size = (3000, 2000)
+        reference = estimate_cost(size, 15, 'PDF', 'reference')
+        packed = estimate_cost(size, 15, 'PDF', 'packed')
+        timeout = (reference['seconds'] + packed['seconds']) / 2
+        assert timeout > packed['seconds']
+
+        plan = JobBudget(timeout=timeout).plan(size, 15, 'PDF', 'reference')
+        assert plan['engine'] == 'packed'
+        assert plan['vector_output'] is True
+        assert plan['size'] == size
+
+        plan = JobBudget(timeout=packed['seconds'] / 2).plan(
+            size, 15, 'PDF', 'reference'
+        )
+        assert plan['vector_output'] is False
+        assert [d.split(':')[0] for d in plan['decisions']][:2] == [
+            'エンジン切り替え', 'ラスター埋め込み'
+        ]
+
+        plan = JobBudget(max_memory_mb=1).plan(size, 15, 'PNG')
+        assert plan['decisions'][-1].startswith('縮小')
+        assert plan['cost']['memory_bytes'] <= 2**20
+
+    def test_cli_rejects_zero_limits(self, tmp_path):
+        """0の上限はエラーになること"""
+        from click.testing import CliRunner
+
+        img_path = tmp_path / 'input.png'
+        Image.new('L', (20, 20), 128).save(img_path)
+        for option in ('--max-pixels', '--max-memory', '--timeout'):
+            result = CliRunner().invoke(
+                silkscreen_converter.main, [str(img_path), option, '0']
+            )
+            assert result.exit_code != 0
+            assert '上限は0より大きい値' in result.output
+
+    def test_timeout_leaves_no_output(self, tmp_path, monkeypatch):
+        """処理時間の上限を超えると中断し、出力ファイルを残さないこと"""
+        img_path = tmp_path / 'input.png'
+        Image.new('L', (200, 200), 128).save(img_path)
+        output = tmp_path / 'out.pdf'
+        budget = JobBudget(timeout=10)
+        # 計画後に期限切れとなるよう、上限を過去に設定
+        monkeypatch.setattr(budget, 'deadline', lambda: time.monotonic() - 1)
+
+        converter = SilkscreenConverter()
+        with pytest.raises(JobTimeoutError):
+            converter.convert(str(img_path), str(output), format_type='PDF',
+                              engine='reference', budget=budget)
+        assert not output.exists()
+        assert converter.deadline is None
+
+
 class TestParameterValidation:
     """パラメーター検証のテスト"""
     
@@ -215,6 +862,18 @@ class TestParameterValidation:
         for shape in valid_shapes:
             assert shape in valid_shapes
 
+    @pytest.mark.parametrize('options', [
+        {'dpi': 0},
+        {'print_width': -10},
+        {'print_height': 0},
+        {'png_compress_level': 10},
+    ])
+    def test_output_options_validation(self, options):
+        """解像度・印刷サイズ・PNG圧縮レベルの検証"""
+        validate_options(15, 45, 1.0, 300, 200, None, 9)
+        with pytest.raises(click.ClickException):
+            validate_options(15, 45, 1.0, **options)
+
 
 class TestImageProcessing:
     """画像処理の詳細テスト"""